@@ -49,6 +49,7 @@ class MediaItemAdmin(admin.ModelAdmin):
     filter_horizontal = ('genres', 'countries',)
     readonly_fields = ('created_at', 'updated_at')
     inlines = [MediaItemSourceMetadataInline, SeasonInline]
+    ordering = ('-updated_at', 'title')
     fieldsets = (
         (None, {'fields': ('title', 'original_title', 'media_type', 'release_year', 'poster_url')}),
         ('External IDs', {'fields': ('kinopoisk_id', 'imdb_id', 'shikimori_id', 'mydramalist_id')}),
@@ -71,6 +72,10 @@ class SeasonAdmin(admin.ModelAdmin):
     search_fields = ('media_item__title', 'season_number')
     inlines = [EpisodeInline]
     autocomplete_fields = ('media_item',)
+    ordering = ('media_item', 'season_number')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_display()
 
     @admin.display(description='Media Item')
     def media_item_link(self, obj):
@@ -89,6 +94,10 @@ class EpisodeAdmin(admin.ModelAdmin):
     search_fields = ('title', 'season__media_item__title', 'episode_number')
     list_display_links = ('__str__',)
     autocomplete_fields = ['season']
+    ordering = ('season', 'episode_number')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_display()
 
     @admin.display(description='Season')
     def season_link(self, obj):
@@ -110,6 +119,9 @@ class MediaSourceLinkAdmin(admin.ModelAdmin):
                      'translation__title')
     readonly_fields = ('added_at', 'last_seen_at')
     autocomplete_fields = ['media_item', 'episode', 'source', 'translation']
+    ordering = ('-added_at',)
+    # get_target_str renders the episode (with its season and item) or the item of every row
+    list_select_related = ('source', 'translation', 'media_item', 'episode__season__media_item')
 
     @admin.display(description='Target')
     def get_target_str(self, obj):
@@ -144,6 +156,8 @@ class MediaItemSourceMetadataAdmin(admin.ModelAdmin):
     search_fields = ('media_item__title', 'source__name')
     readonly_fields = ('source_last_updated_at',)
     autocomplete_fields = ('media_item', 'source')
+    ordering = ('media_item', 'source')
+    list_select_related = ('media_item', 'source')
 
     @admin.display(description='Media Item')
     def media_item_link(self, obj):
@@ -161,6 +175,8 @@ class ScreenshotAdmin(admin.ModelAdmin):
     search_fields = ('url', 'episode__season__media_item__title')
     readonly_fields = ('url_thumbnail',)
     autocomplete_fields = ('episode',)
+    ordering = ('episode', 'id')
+    list_select_related = ('episode__season__media_item',)
 
     @admin.display(description='Episode')
     def episode_link(self, obj):
@@ -1,8 +1,7 @@
 # catalog/cms_plugins.py
 from cms.plugin_base import CMSPluginBase
 from cms.plugin_pool import plugin_pool
-from django.db import models
-from django.db.models import Max, F, Case, When, Value
+from django.db.models import Max
 from django.utils.translation import gettext_lazy as _
 
 from .models import (
@@ -23,7 +22,7 @@ class LatestMediaPlugin(CMSPluginBase):
 
     def render(self, context, instance, placeholder):
         context = super().render(context, instance, placeholder)
-        latest_items = MediaItem.objects.order_by('-updated_at').prefetch_related('genres')[:instance.latest_count]
+        latest_items = MediaItem.objects.for_list().order_by('-updated_at')[:instance.latest_count]
         context['media_items'] = latest_items
         context['instance'] = instance
         return context
@@ -40,7 +39,8 @@ class FeaturedMediaPlugin(CMSPluginBase):
 
     def render(self, context, instance, placeholder):
         context = super().render(context, instance, placeholder)
-        featured_items = instance.items.prefetch_related('genres').all()
+        featured_items = list(instance.items.for_list().order_by('-updated_at', 'title'))
+        instance._items_count = len(featured_items)  # Spares str(instance) its COUNT query
         context['media_items'] = featured_items
         context['instance'] = instance
         context['title'] = instance.title
@@ -58,7 +58,7 @@ class MediaListByCriteriaPlugin(CMSPluginBase):
 
     def render(self, context, instance, placeholder):
         context = super().render(context, instance, placeholder)
-        queryset = MediaItem.objects.all().prefetch_related('genres')
+        queryset = MediaItem.objects.for_list()
         if instance.media_type: queryset = queryset.filter(media_type=instance.media_type)
         if instance.year_from: queryset = queryset.filter(release_year__gte=instance.year_from)
         if instance.year_to: queryset = queryset.filter(release_year__lte=instance.year_to)
@@ -66,7 +66,7 @@ class MediaListByCriteriaPlugin(CMSPluginBase):
         if selected_genres.exists(): queryset = queryset.filter(genres__in=selected_genres).distinct()
         selected_countries = instance.countries.all()
         if selected_countries.exists(): queryset = queryset.filter(countries__in=selected_countries).distinct()
-        if instance.sort_by: queryset = queryset.order_by(instance.sort_by)
+        queryset = queryset.order_by(instance.sort_by or '-updated_at')
         filtered_items = queryset[:instance.max_items]
         context['media_items'] = filtered_items
         context['instance'] = instance
@@ -96,19 +96,11 @@ class ContinueWatchingPlugin(CMSPluginBase):
             user = request.user
 
             # 1. Find the latest 'watched_at' for each MediaItem the user interacted with.
+            #    media_item is denormalized onto the history row, so this is a single-table GROUP BY.
             latest_watch_times_per_item = ViewingHistory.objects.filter(
-                user=user
-            ).annotate(
-                media_item_pk=Case(
-                    When(link__episode__isnull=False, then=F('link__episode__season__media_item__pk')),
-                    When(link__media_item__isnull=False, then=F('link__media_item__pk')),
-                    default=Value(None, output_field=models.IntegerField()),
-                    output_field=models.IntegerField()
-                )
-            ).filter(
-                media_item_pk__isnull=False
+                user=user, media_item__isnull=False
             ).values(
-                'media_item_pk'
+                'media_item'
             ).annotate(
                 latest_watched_at=Max('watched_at')
             ).order_by(
@@ -117,28 +109,16 @@ class ContinueWatchingPlugin(CMSPluginBase):
 
             # Create a dictionary for quick lookup: {media_item_pk: latest_watched_at}
             latest_times_dict = {
-                item['media_item_pk']: item['latest_watched_at']
+                item['media_item']: item['latest_watched_at']
                 for item in latest_watch_times_per_item
             }
 
             if latest_times_dict:
-                # 2. Fetch all history entries for this user related to the target media items.
-                #    We need to determine the media item PK again for filtering.
+                # 2. Fetch the user's history entries for the target media items (only what step 3 reads).
                 relevant_history_entries_qs = ViewingHistory.objects.filter(
-                    user=user
-                ).annotate(
-                    # Annotate again to filter based on the keys we found
-                    media_item_pk_for_filter=Case(
-                        When(link__episode__isnull=False, then=F('link__episode__season__media_item__pk')),
-                        When(link__media_item__isnull=False, then=F('link__media_item__pk')),
-                        default=Value(None, output_field=models.IntegerField()),
-                        output_field=models.IntegerField()
-                    )
-                ).filter(
-                    media_item_pk_for_filter__in=latest_times_dict.keys()
-                ).select_related(  # Select related needed for the loop below
-                    'link__episode__season__media_item',
-                    'link__media_item'
+                    user=user, media_item__in=latest_times_dict.keys()
+                ).select_related(None).only(
+                    'id', 'media_item_id', 'watched_at'
                 ).order_by('-watched_at')  # Order by watched_at to process latest first
 
                 # 3. Iterate through these entries in Python to find the exact latest one for each media item.
@@ -146,11 +126,7 @@ class ContinueWatchingPlugin(CMSPluginBase):
                 processed_media_items = set()
 
                 for entry in relevant_history_entries_qs:
-                    media_item_pk = None
-                    if entry.link.episode:
-                        media_item_pk = entry.link.episode.season.media_item_id
-                    elif entry.link.media_item:
-                        media_item_pk = entry.link.media_item_id
+                    media_item_pk = entry.media_item_id
 
                     # Check if it's a target media item and the time matches the latest known time for it
                     if (media_item_pk in latest_times_dict and
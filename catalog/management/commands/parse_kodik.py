@@ -2,7 +2,9 @@
 
 import logging
 import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timezone
+from itertools import repeat
 from typing import Optional
 
 from dateutil.parser import isoparse
@@ -30,6 +32,19 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 KODIK_SOURCE_SLUG = 'kodik'
+# Below this many items a page is mapped in-process; worker IPC would cost more than it saves.
+PARALLEL_MAP_THRESHOLD = 32
+PARALLEL_MAP_CHUNKSIZE = 16
+
+
+def _map_item(item_data):
+    """Maps one /list item, returning None instead of raising so a bad item is only counted as skipped."""
+    try:
+        return map_kodik_item_to_models(item_data)
+    except Exception as e:
+        item_id = item_data.get('id', 'N/A') if isinstance(item_data, dict) else 'N/A'
+        logger.exception(f"Error mapping item {item_id}: {e}")
+        return None
 
 
 class Command(BaseCommand):
@@ -58,6 +73,9 @@ class Command(BaseCommand):
                             help='Request additional material data (needed for genres, countries, description, poster).')
         parser.add_argument('--fill-empty-fields', action='store_true',
                             help='Update empty fields on existing items even if API data is not newer.')
+        parser.add_argument('--map-workers', type=int, default=0, dest='map_workers',
+                            help=f'Map pages of {PARALLEL_MAP_THRESHOLD}+ items in this many worker processes '
+                                 f'(default: 0, map in-process).')
 
     # --- _get_kodik_source, _log - без изменений ---
     def _get_kodik_source(self) -> Source:
@@ -123,117 +141,149 @@ class Command(BaseCommand):
         page_limit = options['limit_pages']
         target_page = options['target_page']
 
-        while True:
-            page_count += 1
-            if page_limit is not None and page_count > page_limit:
-                self._log(f"\nReached page limit ({page_limit}). Stopping.", self.style.WARNING)
-                break
-
-            self._log(f"\nFetching page {page_count}...", verbosity=1)
-            start_time = time.time()
-            response_data = None
+        def fetch_page(page_link: Optional[str]):
+            if page_link:
+                return client.list_items(page_link=page_link)
+            return client.list_items(limit=limit_per_page, **api_params)
+
+        # One background fetcher: the next page downloads while the current one is written to the DB.
+        fetcher = ThreadPoolExecutor(max_workers=1)
+        next_fetch = fetcher.submit(fetch_page, next_page_link)
+        # Mapping is pure CPU work on plain dicts, so large pages can be spread across processes.
+        map_workers = max(options['map_workers'], 0)
+        mapper_pool = ProcessPoolExecutor(max_workers=map_workers) if map_workers else None
+
+        def map_page(page_results):
+            """Maps a large page in the worker processes; returns None to have the items mapped in-process."""
+            nonlocal mapper_pool
+            if not mapper_pool or len(page_results) < PARALLEL_MAP_THRESHOLD:
+                return None
             try:
-                if next_page_link:
-                    response_data = client.list_items(page_link=next_page_link)
+                return list(mapper_pool.map(_map_item, page_results, chunksize=PARALLEL_MAP_CHUNKSIZE))
+            except Exception as e:  # BrokenProcessPool after a worker died, pickling errors
+                logger.exception(f"Parallel mapping failed, mapping in-process from now on: {e}")
+                mapper_pool.shutdown(cancel_futures=True)
+                mapper_pool = None
+                return None
+
+        try:
+            while True:
+                page_count += 1
+                if page_limit is not None and page_count > page_limit:
+                    self._log(f"\nReached page limit ({page_limit}). Stopping.", self.style.WARNING)
+                    break
+
+                self._log(f"\nFetching page {page_count}...", verbosity=1)
+                start_time = time.time()
+                response_data = None
+                try:
+                    response_data = next_fetch.result()
+                except Exception as e:
+                    logger.exception(f"Error during API request for page {page_count}: {e}")
+                    self.stderr.write(self.style.ERROR(f"Failed to fetch data for page {page_count}. Check logs."))
+                    stats['error'] += 1  # Count as error
+                    break  # Stop processing if API fails
+
+                fetch_duration = time.time() - start_time
+                self._log(f"Page {page_count} fetched in {fetch_duration:.2f}s.", verbosity=2)
+
+                if response_data is None:
+                    self.stderr.write(self.style.ERROR(f"Failed to get response data for page {page_count}."))
+                    stats['error'] += 1  # Count as error
+                    break
+
+                results = response_data.get('results', [])
+                total_api = response_data.get('total', 'N/A')
+                next_page_link = response_data.get('next_page')  # Update next_page_link
+                if next_page_link and (page_limit is None or page_count < page_limit):
+                    next_fetch = fetcher.submit(fetch_page, next_page_link)
+                should_process_page = not (target_page and page_count < target_page)
+
+                if not should_process_page:
+                    self._log(f"Skipping processing for page {page_count} (target: {target_page}).", verbosity=1)
+                    if not next_page_link: break  # Still check if it was the last page
+                    continue  # Go to next page fetch
+
+                # --- Process items on page ---
+                if not results:
+                    self._log(f"No results found on page {page_count}.", verbosity=1)
                 else:
-                    core_api_params = api_params.copy()
-                    response_data = client.list_items(limit=limit_per_page, **core_api_params)
-            except Exception as e:
-                logger.exception(f"Error during API request for page {page_count}: {e}")
-                self.stderr.write(self.style.ERROR(f"Failed to fetch data for page {page_count}. Check logs."))
-                stats['error'] += 1  # Count as error
-                break  # Stop processing if API fails
-
-            fetch_duration = time.time() - start_time
-            self._log(f"Page {page_count} fetched in {fetch_duration:.2f}s.", verbosity=2)
-
-            if response_data is None:
-                self.stderr.write(self.style.ERROR(f"Failed to get response data for page {page_count}."))
-                stats['error'] += 1  # Count as error
-                break
-
-            results = response_data.get('results', [])
-            total_api = response_data.get('total', 'N/A')
-            next_page_link = response_data.get('next_page')  # Update next_page_link
-            should_process_page = not (target_page and page_count < target_page)
-
-            if not should_process_page:
-                self._log(f"Skipping processing for page {page_count} (target: {target_page}).", verbosity=1)
-                if not next_page_link: break  # Still check if it was the last page
-                continue  # Go to next page fetch
-
-            # --- Process items on page ---
-            if not results:
-                self._log(f"No results found on page {page_count}.", verbosity=1)
-            else:
-                self._log(f"Processing {len(results)} items from page {page_count} (API Total: {total_api})...",
-                          verbosity=1)
-                results_iterable = results
-                if TQDM_AVAILABLE and self.verbosity == 1:
-                    results_iterable = tqdm(results, desc=f"Page {page_count}", unit="item", leave=False, ncols=100)
-
-                page_start_time = time.time()
-                for item_data in results_iterable:
-                    # Parse updated_at here before passing to processor
-                    api_updated_at_str = item_data.get('updated_at')
-                    api_updated_at: Optional[datetime] = None
-                    action_taken = 'skipped_invalid_date'  # Default if parsing fails
-
-                    if api_updated_at_str:
-                        try:
-                            api_updated_at = isoparse(api_updated_at_str)
-                            if api_updated_at.tzinfo is None:
-                                api_updated_at = api_updated_at.replace(tzinfo=timezone.utc)
-
-                            # Map data
-                            mapped_data = map_kodik_item_to_models(item_data)
-
-                            # Process using the processor
-                            if mapped_data and api_updated_at:
-                                try:
-                                    # Use transaction.atomic around the processor call if needed,
-                                    # though processor uses it internally now.
-                                    # with transaction.atomic():
-                                    processed_item, action_taken = processor.process_api_item(mapped_data,
-                                                                                              api_updated_at)
-                                except Exception as proc_err:
-                                    # Catch unexpected errors from processor itself
-                                    logger.exception(
-                                        f"Unhandled error from MediaItemProcessor for item {item_data.get('id', 'N/A')}: {proc_err}")
-                                    action_taken = 'error_processor_unhandled'
-
-                            elif not mapped_data:
-                                action_taken = 'skipped_mapping_failed'
-
-                        except (ValueError, TypeError) as e:
+                    self._log(f"Processing {len(results)} items from page {page_count} (API Total: {total_api})...",
+                              verbosity=1)
+                    page_start_time = time.time()
+                    premapped = map_page(results)
+                    results_iterable = zip(results, premapped if premapped is not None else repeat(None))
+                    if TQDM_AVAILABLE and self.verbosity == 1:
+                        results_iterable = tqdm(results_iterable, total=len(results), desc=f"Page {page_count}",
+                                                unit="item", leave=False, ncols=100)
+
+                    for item_data, mapped_data in results_iterable:
+                        # Parse updated_at here before passing to processor
+                        api_updated_at_str = item_data.get('updated_at')
+                        api_updated_at: Optional[datetime] = None
+                        action_taken = 'skipped_invalid_date'  # Default if parsing fails
+
+                        if api_updated_at_str:
+                            try:
+                                api_updated_at = isoparse(api_updated_at_str)
+                                if api_updated_at.tzinfo is None:
+                                    api_updated_at = api_updated_at.replace(tzinfo=timezone.utc)
+
+                                # Map data (unless the page was already mapped in worker processes)
+                                if premapped is None:
+                                    mapped_data = _map_item(item_data)
+
+                                # Process using the processor
+                                if mapped_data and api_updated_at:
+                                    try:
+                                        # Use transaction.atomic around the processor call if needed,
+                                        # though processor uses it internally now.
+                                        # with transaction.atomic():
+                                        processed_item, action_taken = processor.process_api_item(mapped_data,
+                                                                                                  api_updated_at)
+                                    except Exception as proc_err:
+                                        # Catch unexpected errors from processor itself
+                                        logger.exception(
+                                            f"Unhandled error from MediaItemProcessor for item {item_data.get('id', 'N/A')}: {proc_err}")
+                                        action_taken = 'error_processor_unhandled'
+
+                                elif not mapped_data:
+                                    action_taken = 'skipped_mapping_failed'
+
+                            except (ValueError, TypeError) as e:
+                                logger.warning(
+                                    f"Could not parse updated_at '{api_updated_at_str}' for item {item_data.get('id', 'N/A')}: {e}. Skipping.")
+                                action_taken = 'skipped_invalid_date'
+                        else:
                             logger.warning(
-                                f"Could not parse updated_at '{api_updated_at_str}' for item {item_data.get('id', 'N/A')}: {e}. Skipping.")
-                            action_taken = 'skipped_invalid_date'
-                    else:
-                        logger.warning(
-                            f"Missing 'updated_at' in API data for item {item_data.get('id', 'N/A')}. Skipping.")
-                        action_taken = 'skipped_missing_date'
-
-                    # Update statistics
-                    if action_taken in stats:
-                        stats[action_taken] += 1
-                    elif 'error' in action_taken:
-                        stats['error'] += 1  # General error counter
-                    else:  # Fallback for unknown statuses
-                        stats['skipped'] += 1
-
-                page_duration = time.time() - page_start_time
-                if TQDM_AVAILABLE and self.verbosity == 1:
-                    self.stdout.write("\r" + " " * 110 + "\r", ending='')  # Clear tqdm line
-
-                # Log page summary using the collected stats
-                self._log(f"Page {page_count} processed in {page_duration:.2f}s. "
-                          f"Counts: C={stats['created']}, U={stats['updated']}, "
-                          f"S(ok)={stats['skipped']}, E={stats['error']}", verbosity=1)
-
-            if not next_page_link:
-                self._log("\nNo 'next_page' link found. Assuming end of results.", self.style.NOTICE)
-                break
+                                f"Missing 'updated_at' in API data for item {item_data.get('id', 'N/A')}. Skipping.")
+                            action_taken = 'skipped_missing_date'
+
+                        # Update statistics
+                        if action_taken in stats:
+                            stats[action_taken] += 1
+                        elif 'error' in action_taken:
+                            stats['error'] += 1  # General error counter
+                        else:  # Fallback for unknown statuses
+                            stats['skipped'] += 1
+
+                    page_duration = time.time() - page_start_time
+                    if TQDM_AVAILABLE and self.verbosity == 1:
+                        self.stdout.write("\r" + " " * 110 + "\r", ending='')  # Clear tqdm line
+
+                    # Log page summary using the collected stats
+                    self._log(f"Page {page_count} processed in {page_duration:.2f}s. "
+                              f"Counts: C={stats['created']}, U={stats['updated']}, "
+                              f"S(ok)={stats['skipped']}, E={stats['error']}", verbosity=1)
+
+                if not next_page_link:
+                    self._log("\nNo 'next_page' link found. Assuming end of results.", self.style.NOTICE)
+                    break
+        finally:
+            fetcher.shutdown(cancel_futures=True)
+            if mapper_pool:
+                mapper_pool.shutdown(cancel_futures=True)
+            client.close()
 
         # --- Final Summary ---
         self._log(f"\nFinished parsing CORE data.", self.style.SUCCESS)
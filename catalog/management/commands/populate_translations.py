@@ -5,10 +5,11 @@ import logging
 from django.core.management.base import BaseCommand, CommandError
 from django.db import IntegrityError, transaction
 
-from catalog.models import Translation
+from catalog.models import Translation, clear_translation_cache
 from catalog.services.kodik_client import KodikApiClient
 
 logger = logging.getLogger(__name__)
+CHUNK_SIZE = 500
 
 
 class Command(BaseCommand):
@@ -51,35 +52,57 @@ class Command(BaseCommand):
         updated_count = 0
         skipped_count = 0
 
-        with transaction.atomic():
-            for trans_data in translations_api:
-                kodik_id = trans_data.get('id')
-                title = trans_data.get('title')
-
-                if not kodik_id or not title:
-                    logger.warning(f"Skipping translation entry due to missing ID or title: {trans_data}")
-                    skipped_count += 1
-                    continue
-
-                try:
-                    translation, created = Translation.objects.update_or_create(
-                        kodik_id=kodik_id,
-                        defaults={'title': title.strip()}
+        # Validate and normalise everything up front so the transactions below only write.
+        prepared = {}
+        for trans_data in translations_api:
+            kodik_id = trans_data.get('id')
+            title = trans_data.get('title')
+
+            if not kodik_id or not title:
+                logger.warning(f"Skipping translation entry due to missing ID or title: {trans_data}")
+                skipped_count += 1
+                continue
+            try:
+                kodik_id = int(kodik_id)
+            except (ValueError, TypeError):
+                logger.warning(f"Skipping translation entry due to invalid ID: {trans_data}")
+                skipped_count += 1
+                continue
+            if kodik_id in prepared:
+                skipped_count += 1  # Duplicate ID in the response; the last entry wins.
+            prepared[kodik_id] = str(title).strip()
+
+        existing_titles = dict(Translation.objects.values_list('kodik_id', 'title'))
+        to_write = []
+        for kodik_id, title in prepared.items():
+            existing_title = existing_titles.get(kodik_id)
+            if existing_title == title:
+                continue
+            translation = Translation(kodik_id=kodik_id, title=title)
+            if existing_title is None:
+                created_count += 1
+                self._log(f"  Created: {translation}", verbosity=2)
+            else:
+                updated_count += 1
+                self._log(f"  Updated: {translation}", verbosity=2)
+            to_write.append(translation)
+
+        # One short transaction and one upsert statement per chunk.
+        for chunk_start in range(0, len(to_write), CHUNK_SIZE):
+            chunk = to_write[chunk_start:chunk_start + CHUNK_SIZE]
+            try:
+                with transaction.atomic():
+                    Translation.objects.bulk_create(
+                        chunk, update_conflicts=True, unique_fields=['kodik_id'], update_fields=['title']
                     )
-                    if created:
-                        created_count += 1
-                        self._log(f"  Created: {translation}", verbosity=2)
-                    else:
-                        if translation.title != title.strip():
-                            updated_count += 1
-                            self._log(f"  Updated: {translation}", verbosity=2)
-
-                except IntegrityError as e:
-                    logger.error(f"Integrity error processing translation ID {kodik_id}, Title '{title}': {e}")
-                    skipped_count += 1
-                except Exception as e:
-                    logger.exception(f"Error processing translation ID {kodik_id}, Title '{title}': {e}")
-                    skipped_count += 1
+            except IntegrityError as e:
+                logger.error(f"Integrity error writing translations chunk at offset {chunk_start}: {e}")
+                skipped_count += len(chunk)
+            except Exception as e:
+                logger.exception(f"Error writing translations chunk at offset {chunk_start}: {e}")
+                skipped_count += len(chunk)
+        # bulk_create sends no post_save, so drop this process's cached titles by hand.
+        clear_translation_cache(sender=Translation)
 
         self._log(f"\nProcessing finished.", self.style.SUCCESS)
         self._log(f"  Total from API: {api_total}", self.style.SUCCESS)
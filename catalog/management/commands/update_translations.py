@@ -1,18 +1,29 @@
 # catalog/management/commands/update_translations.py
 
+import asyncio
+import hashlib
+import io
+import json
 import logging
+import random
+from collections import defaultdict
 # Import timedelta from datetime
-from datetime import timedelta
-from typing import Dict, Set
+from datetime import datetime, timedelta
+from functools import lru_cache
+from operator import attrgetter
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Tuple, Union
 
+import httpx
+from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
-from django.db import transaction
-from django.db.models import Q, OuterRef, Subquery
+from django.db import connection, transaction
+from django.db.models import Count, Exists, Max, Q, OuterRef, Sum
 # Keep timezone import for now()
 from django.utils import timezone
 
 from catalog.models import (
-    MediaItem, Source, Season, Episode, MediaSourceLink, Screenshot, Translation, MediaItemSourceMetadata
+    MediaItem, Source, Season, Episode, MediaSourceLink, Screenshot, Translation, MediaItemSourceMetadata,
+    EXTERNAL_ID_FIELDS, HAS_EXTERNAL_ID
 )
 from catalog.services.kodik_client import KodikApiClient
 
@@ -23,8 +34,75 @@ try:
 except ImportError:
     TQDM_AVAILABLE = False
 
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 KODIK_SOURCE_SLUG = 'kodik'
+LINK_UPDATE_FIELDS = ['player_link', 'quality_info', 'last_seen_at', 'source_specific_id']
+# Only the columns used for searching and logging; skips descriptions, posters, etc.
+ITEM_FIELDS = ('pk', 'title', *EXTERNAL_ID_FIELDS)
+# Columns the preloads actually need; skips e.g. added_at and unused FKs.
+SEASON_FIELDS = ('id', 'media_item_id', 'season_number')
+EPISODE_FIELDS = ('id', 'season_id', 'episode_number', 'title')
+LINK_FIELDS = ('id', 'episode_id', 'translation_id', *LINK_UPDATE_FIELDS)
+# Columns written by the PostgreSQL COPY fast path for an item's first batch of links.
+COPY_LINK_FIELDS = ('source', 'media_item', 'episode', 'translation', *LINK_UPDATE_FIELDS, 'added_at')
+# Below this many rows a multi-row INSERT is as fast as COPY and keeps the generic code path.
+COPY_MIN_ROWS = 100
+SEARCH_EXTRA_PARAMS = {'with_episodes_data': 'true', 'with_material_data': 'true', 'limit': 100}
+# Field in a /search result holding each of our external IDs.
+RESULT_ID_KEYS = {'kinopoisk_id': 'kinopoisk_id', 'imdb_id': 'imdb_id', 'shikimori_id': 'shikimori_id',
+                  'mydramalist_id': 'mdl_id'}
+# Above this kodik_id the translation map falls back from a dense list to a dict.
+DENSE_TRANSLATION_MAP_LIMIT = 200_000
+
+TranslationMap = Union[List[Optional[int]], Dict[int, int]]
+# Last map built in this process, keyed by the Translation table fingerprint.
+_translation_map_memo: Dict[str, Any] = {}
+EpisodeKey = Tuple[int, int]
+
+
+@lru_cache(maxsize=1024)
+def _parse_number_key(key: Any) -> Optional[int]:
+    """Parses a season/episode key such as "1" or "-1"; returns None for anything else."""
+    if type(key) is not str:
+        return None
+    digits = key[1:] if key.startswith('-') else key
+    return int(key) if digits.isdecimal() else None
+
+
+class ExternalIDs(NamedTuple):
+    """An item's external IDs, in EXTERNAL_ID_FIELDS order; empty values are None."""
+    kinopoisk_id: Optional[str]
+    imdb_id: Optional[str]
+    shikimori_id: Optional[str]
+    mydramalist_id: Optional[str]
+
+
+_get_external_id_values = attrgetter(*EXTERNAL_ID_FIELDS)
+
+
+class StagedLink(NamedTuple):
+    """One link's values from a /search response; last_seen_at is the response's checked_at."""
+    player_link: str
+    quality_info: Optional[str]
+    source_specific_id: Optional[str]  # Only main links carry it; episode links keep the stored value
+    translation_title: Any  # Log label only
+
+
+class ParsedResponse(NamedTuple):
+    """Rows staged from one item's /search response, ready to be persisted."""
+    response_hash: str
+    checked_at: datetime
+    season_numbers: Dict[int, None]
+    episode_titles: Dict[EpisodeKey, Optional[str]]
+    episode_screenshots: Dict[EpisodeKey, Dict[str, None]]  # Ordered set of URLs per episode
+    staged_links: Dict[Tuple[Optional[EpisodeKey], int], StagedLink]
 
 
 class Command(BaseCommand):
@@ -38,10 +116,22 @@ class Command(BaseCommand):
                             help='Update translations for ALL MediaItems in the database.')
         parser.add_argument('--limit', type=int, default=None,
                             help='Limit the number of MediaItems processed when using --all.')
+        parser.add_argument('--random', action='store_true',
+                            help='With --all and --limit, process a random sample instead of the lowest PKs.')
         parser.add_argument('--skip-recently-updated-meta', type=int, default=None, metavar='HOURS',
                             help='Skip items whose source metadata was updated within the last X hours (useful for --all).')
+        parser.add_argument('--skip-checked-within', type=int, default=None, metavar='HOURS',
+                            help='Skip items whose translations were already fetched within the last X hours '
+                                 '(useful for rerunning --all).')
         parser.add_argument('--cleanup', action='store_true',
                             help='Remove stale MediaSourceLinks for processed items after updating.')
+        parser.add_argument('--concurrency', type=int, default=20,
+                            help='Maximum number of concurrent Kodik API requests (default: 20).')
+        parser.add_argument('--fetch-batch-size', type=int, default=1,
+                            help='Search up to N items sharing an ID type in one Kodik request (default: 1, off). '
+                                 'Batches whose results would be truncated are refetched per item.')
+        parser.add_argument('--batch-size', type=int, default=50, dest='batch_size',
+                            help='Number of MediaItems fetched and committed together in one transaction (default: 50).')
 
     def _get_kodik_source(self) -> Source:
         try:
@@ -54,46 +144,141 @@ class Command(BaseCommand):
             styled_message = style(message) if style else message
             self.stdout.write(styled_message, ending=ending)
 
-    def _get_translation_map(self) -> Dict[int, Translation]:
-        return {t.kodik_id: t for t in Translation.objects.all()}
-
-    @transaction.atomic
-    def _process_media_item(self, media_item: MediaItem, kodik_source: Source, client: KodikApiClient,
-                            translation_map: Dict[int, Translation], cleanup: bool):
-        """Processes a single MediaItem: fetches all translations and updates related objects."""
-        self._log(f"Processing MediaItem PK {media_item.pk}: '{media_item.title}'", verbosity=2)
-        search_ids = {
-            'kinopoisk_id': media_item.kinopoisk_id, 'imdb_id': media_item.imdb_id,
-            'shikimori_id': media_item.shikimori_id, 'mydramalist_id': media_item.mydramalist_id
-        }
-        search_ids_filtered = {k: v for k, v in search_ids.items() if v}
-        if not search_ids_filtered:
-            self._log(f"  Skipping Item {media_item.pk}: No external IDs found for search.", style=self.style.WARNING)
-            return 0
-
-        search_params = {
-            **search_ids_filtered,
-            'with_episodes_data': 'true',
-            'with_material_data': 'true'
-        }
-        self._log(f"  Searching Kodik using IDs: {search_ids_filtered}", verbosity=3)
-        response_data = client.search_by_ids(**search_params, limit=100)
-
-        if response_data is None or 'results' not in response_data:
-            self._log(f"  Failed to fetch search results for Item {media_item.pk}. Check logs.", style=self.style.ERROR)
-            return 0
-
-        search_results = response_data.get('results', [])
-        processed_count = 1  # Assume processed if we got this far
+    def _get_translation_map(self) -> TranslationMap:
+        """
+        Maps Kodik translation IDs to local Translation PKs (no model instances are built).
+        Kodik IDs are small dense integers, so a list indexed by kodik_id is used when the
+        range allows it; otherwise falls back to a dict.
+        """
+        fingerprint = self._get_translation_fingerprint()
+        # Folded into every response hash, so a changed table reprocesses otherwise unchanged items.
+        self.translation_fingerprint = fingerprint
+        if _translation_map_memo.get('fingerprint') == fingerprint:
+            return _translation_map_memo['map']
+
+        pairs = self._load_cached_translation_pairs(fingerprint)
+        max_kodik_id = max((kodik_id for kodik_id, _ in pairs), default=-1)
+        if max_kodik_id >= DENSE_TRANSLATION_MAP_LIMIT:
+            translation_map: TranslationMap = dict(pairs)
+        else:
+            translation_map = [None] * (max_kodik_id + 1)
+            for kodik_id, pk in pairs:
+                translation_map[kodik_id] = pk
+        # Reused by later runs in the same process (call_command from a scheduler, tests).
+        _translation_map_memo.update(fingerprint=fingerprint, map=translation_map)
+        return translation_map
+
+    @staticmethod
+    def _get_translation_fingerprint() -> List[Any]:
+        """Cheap summary of the Translation table that changes whenever the mapping can change."""
+        stats = Translation.objects.aggregate(max_pk=Max('pk'), count=Count('pk'), kodik_sum=Sum('kodik_id'))
+        return [str(connection.settings_dict['NAME']), stats['max_pk'], stats['count'], stats['kodik_sum']]
+
+    def _load_cached_translation_pairs(self, fingerprint: List[Any]) -> List[Tuple[int, int]]:
+        """
+        Returns (kodik_id, pk) pairs, reusing the KODIK_TRANSLATION_MAP_CACHE file when the
+        Translation table still has the same fingerprint; otherwise reads the table and rewrites it.
+        """
+        cache_path = getattr(settings, 'KODIK_TRANSLATION_MAP_CACHE', None)
+        if not cache_path:
+            return list(Translation.objects.values_list('kodik_id', 'pk'))
 
+        try:
+            with open(cache_path, encoding='utf-8') as cache_file:
+                cached = json.load(cache_file)
+            if cached.get('fingerprint') == fingerprint:
+                self._log("Using cached translation map.", verbosity=2)
+                return [(kodik_id, pk) for kodik_id, pk in cached['pairs']]
+        except (OSError, ValueError, KeyError, TypeError):
+            pass  # Missing or unreadable cache, rebuild below.
+
+        pairs = list(Translation.objects.values_list('kodik_id', 'pk'))
+        try:
+            with open(cache_path, 'w', encoding='utf-8') as cache_file:
+                json.dump({'fingerprint': fingerprint, 'pairs': pairs}, cache_file)
+        except OSError as e:
+            logger.warning(f"Could not write translation map cache to {cache_path}: {e}")
+        return pairs
+
+    @staticmethod
+    def _lookup_translation(translation_map: TranslationMap, kodik_id: Any) -> Optional[int]:
+        """Returns the Translation PK for a Kodik translation ID, or None if unknown."""
+        if isinstance(translation_map, dict):
+            return translation_map.get(kodik_id)
+        if isinstance(kodik_id, int) and 0 <= kodik_id < len(translation_map):
+            return translation_map[kodik_id]
+        return None
+
+    @staticmethod
+    def _get_external_ids(media_item: MediaItem) -> Optional[ExternalIDs]:
+        """Returns the item's external IDs, or None if it has none."""
+        values = _get_external_id_values(media_item)
+        if not any(values):
+            return None
+        return ExternalIDs._make(value or None for value in values)
+
+    def _get_search_params(self, media_item: MediaItem) -> Optional[Dict[str, Any]]:
+        """Builds search_by_ids kwargs for an item, or None if it has no external IDs."""
+        external_ids = self._get_external_ids(media_item)
+        if external_ids is None:
+            return None
+        # The only dict built per item, at the API client boundary.
+        search_params = {field: value for field, value in zip(ExternalIDs._fields, external_ids) if value}
+        search_params.update(SEARCH_EXTRA_PARAMS)
+        return search_params
+
+    @staticmethod
+    def _get_response_hash(search_results: List[Any], translation_fingerprint: List[Any]) -> str:
+        """
+        Stable digest of the search results and the translation map they were staged with, used to detect
+        unchanged responses. Digests differ between the orjson and stdlib encodings, so installing orjson
+        makes the next run rewrite every item once.
+        """
+        if ORJSON_AVAILABLE:
+            payload = orjson.dumps(search_results, option=orjson.OPT_SORT_KEYS)
+        else:
+            payload = json.dumps(search_results, sort_keys=True, ensure_ascii=False).encode()
+        digest = hashlib.blake2b(json.dumps(translation_fingerprint, default=str).encode(), digest_size=16)
+        digest.update(payload)
+        return digest.hexdigest()
+
+    async def _fetch_search_results(self, client: KodikApiClient, session: httpx.AsyncClient,
+                                    params_list: List[Dict[str, Any]],
+                                    concurrency: int) -> List[Optional[Dict[str, Any]]]:
+        """
+        Runs search_by_ids for every params dict concurrently; results keep the input order.
+        Identical params (items sharing an external ID) are requested once and share the response.
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+            async with semaphore:
+                return await client.search_by_ids_async(session, **params)
+
+        inflight: Dict[Tuple[Tuple[str, Any], ...], asyncio.Task] = {}
+        tasks = []
+        for params in params_list:
+            key = tuple(sorted(params.items()))
+            if key not in inflight:
+                inflight[key] = asyncio.ensure_future(fetch(params))
+            tasks.append(inflight[key])
+        return await asyncio.gather(*tasks)
+
+    def _parse_search_results(self, media_item: MediaItem, search_results: List[Dict[str, Any]],
+                              translation_map: TranslationMap) -> ParsedResponse:
+        """Turns the /search variants of an item into staged rows; pure Python, no queries."""
         if not search_results:
             self._log(f"  No search results (translations) found for Item {media_item.pk}.", verbosity=2)
         else:
             self._log(f"  Found {len(search_results)} translation variants for Item {media_item.pk}.", verbosity=2)
 
-        processed_link_pks: Set[int] = set()
         check_start_time = timezone.now()
 
+        season_numbers: Dict[int, None] = {}
+        episode_titles: Dict[EpisodeKey, Optional[str]] = {}
+        episode_screenshots: Dict[EpisodeKey, Dict[str, None]] = defaultdict(dict)
+        staged_links: Dict[Tuple[Optional[EpisodeKey], int], StagedLink] = {}
+
         for item_variant_data in search_results:
             variant_translation_data = item_variant_data.get('translation')
             if not variant_translation_data or 'id' not in variant_translation_data:
@@ -101,124 +286,385 @@ class Command(BaseCommand):
                 continue
 
             kodik_translation_id = variant_translation_data['id']
-            translation_obj = translation_map.get(kodik_translation_id)
-            if not translation_obj:
+            translation_pk = self._lookup_translation(translation_map, kodik_translation_id)
+            if not translation_pk:
                 logger.warning(
                     f"Skipping variant for Item {media_item.pk}: Translation ID {kodik_translation_id} not found.")
                 continue
+            # Only used for log labels; the API already sends the studio name.
+            translation_title = variant_translation_data.get('title') or kodik_translation_id
 
             variant_link = item_variant_data.get('link')
             variant_quality = item_variant_data.get('quality')
             variant_source_specific_id = item_variant_data.get('id')
 
             if variant_link:
-                link_defaults = {
-                    'player_link': variant_link, 'quality_info': variant_quality,
-                    'last_seen_at': check_start_time, 'source_specific_id': variant_source_specific_id
-                }
-                link_lookup = {
-                    'source': kodik_source, 'media_item': media_item,
-                    'episode': None, 'translation': translation_obj
-                }
-                try:
-                    link_obj, created = MediaSourceLink.objects.update_or_create(defaults=link_defaults, **link_lookup)
-                    log_action = "Created" if created else "Updated"
-                    self._log(f"    {log_action} Main Link: {translation_obj.title}", verbosity=3)
-                    processed_link_pks.add(link_obj.pk)
-                except Exception as e:
-                    logger.error(
-                        f"Error saving main link for Item {media_item.pk}, Translation {translation_obj.title}: {e}")
+                staged_links[(None, translation_pk)] = StagedLink(
+                    variant_link, variant_quality, variant_source_specific_id, translation_title)
 
             api_seasons_data = item_variant_data.get('seasons', {})
-            if api_seasons_data:
-                for season_num_str, season_content in api_seasons_data.items():
-                    try:
-                        season_number = int(season_num_str)
-                    except (ValueError, TypeError):
-                        continue
-                    if season_number < -1:
+            if not api_seasons_data:
+                continue
+            for season_num_str, season_content in api_seasons_data.items():
+                season_number = _parse_number_key(season_num_str)
+                if season_number is None or season_number < -1:
+                    continue
+
+                season_numbers[season_number] = None
+                episodes_list_data = season_content.get('episodes') if isinstance(season_content, dict) else None
+                if not episodes_list_data or not isinstance(episodes_list_data, dict):
+                    continue
+
+                for episode_num_str, episode_content in episodes_list_data.items():
+                    episode_number = _parse_number_key(episode_num_str)
+                    if episode_number is None or episode_number <= 0:
                         continue
 
-                    episodes_list_data = season_content.get('episodes') if isinstance(season_content, dict) else None
+                    ep_key = (season_number, episode_number)
+                    match episode_content:
+                        case str():
+                            episode_link, episode_title, screenshots_raw = episode_content, None, None
+                        case dict():
+                            episode_link = episode_content.get('link')
+                            episode_title = episode_content.get('title')
+                            screenshots_raw = episode_content.get('screenshots')
+                        case _:
+                            episode_link = episode_title = screenshots_raw = None
+
+                    # Every translation repeats the episode; a bare-link variant must not wipe a known title.
+                    if episode_title or ep_key not in episode_titles:
+                        episode_titles[ep_key] = episode_title
+                    if type(screenshots_raw) is list:
+                        ep_screenshots = episode_screenshots[ep_key]
+                        for screenshot_url in screenshots_raw:
+                            if type(screenshot_url) is str and screenshot_url.startswith('http'):
+                                ep_screenshots[screenshot_url] = None
+
+                    if episode_link:
+                        staged_links[(ep_key, translation_pk)] = StagedLink(
+                            episode_link, variant_quality, None, translation_title)
+
+        return ParsedResponse(
+            response_hash=self._get_response_hash(search_results, self.translation_fingerprint), checked_at=check_start_time,
+            season_numbers=season_numbers, episode_titles=episode_titles,
+            episode_screenshots=episode_screenshots, staged_links=staged_links,
+        )
+
+    def _process_media_item(self, media_item: MediaItem, parsed: ParsedResponse, kodik_source: Source,
+                            cleanup: bool, previous_hash: Optional[str] = None):
+        """Stores the parsed translation variants of a single MediaItem and related objects."""
+        processed_count = 1
+        check_start_time = parsed.checked_at
+        season_numbers = parsed.season_numbers
+        episode_titles = parsed.episode_titles
+        episode_screenshots = parsed.episode_screenshots
+        staged_links = parsed.staged_links
+
+        if parsed.response_hash == previous_hash:
+            # Nothing changed since the last run: only mark the links seen by that run as seen again.
+            item_links_qs = MediaSourceLink.objects.filter(
+                Q(media_item=media_item, episode=None) | Q(episode__season__media_item=media_item),
+                source=kodik_source
+            )
+            last_seen = item_links_qs.aggregate(last_seen=Max('last_seen_at'))['last_seen']
+            if last_seen is not None:
+                item_links_qs.filter(last_seen_at__gte=last_seen).update(last_seen_at=check_start_time)
+            self._log(f"  Response unchanged for Item {media_item.pk}, skipping.", verbosity=2)
+            if cleanup:
+                self._cleanup_stale_links(media_item, kodik_source, check_start_time)
+            MediaItemSourceMetadata.objects.update_or_create(
+                media_item=media_item, source=kodik_source, defaults={'last_checked_at': check_start_time}
+            )
+            return processed_count
+
+        # Preload what already exists for this item: 4 queries instead of one per season/episode/link.
+        seasons_qs = Season.objects.filter(media_item=media_item).only(*SEASON_FIELDS)
+        episodes_qs = Episode.objects.filter(season__media_item=media_item).only(*EPISODE_FIELDS)
+        seasons_by_num = {s.season_number: s for s in seasons_qs}
+        episodes_by_key = {(ep.season_id, ep.episode_number): ep for ep in episodes_qs}
+        # Screenshot URLs are globally unique by url_hash, so look the response URLs up directly on that
+        # index (no join through episode/season) and skip URLs attached to any episode.
+        existing_screenshot_urls: Set[str] = set()
+        urls_by_hash = {Screenshot.hash_url(url): url for urls in episode_screenshots.values() for url in urls}
+        response_hashes = list(urls_by_hash)
+        for start in range(0, len(response_hashes), self.bulk_batch_size):
+            existing_screenshot_urls.update(urls_by_hash[bytes(url_hash)] for url_hash in Screenshot.objects.filter(
+                url_hash__in=response_hashes[start:start + self.bulk_batch_size]).values_list('url_hash', flat=True))
+        links_by_key = {
+            (link.episode_id, link.translation_id): link
+            for link in MediaSourceLink.objects.filter(
+                Q(media_item=media_item, episode=None) | Q(episode__season__media_item=media_item),
+                source=kodik_source
+            ).only(*LINK_FIELDS)
+        }
 
-                    try:
-                        season, season_created = Season.objects.get_or_create(media_item=media_item,
-                                                                              season_number=season_number)
-                    except Exception as e:
-                        logger.error(f"Error get/create Season {season_number} for Item {media_item.pk}: {e}")
-                        continue
+        new_seasons = [Season(media_item=media_item, season_number=number)
+                       for number in season_numbers if number not in seasons_by_num]
+        if new_seasons:
+            # Same upsert as for episodes below: a no-op update on conflict still returns every PK,
+            # which spares re-reading the item's seasons.
+            Season.objects.bulk_create(
+                new_seasons, update_conflicts=True, unique_fields=['media_item', 'season_number'],
+                update_fields=['season_number'], batch_size=self.bulk_batch_size
+            )
+            if all(season.pk for season in new_seasons):
+                seasons_by_num.update((season.season_number, season) for season in new_seasons)
+            else:
+                seasons_by_num = {s.season_number: s for s in seasons_qs.all()}
+
+        new_episodes = []
+        changed_episodes = []
+        for (season_number, episode_number), episode_title in episode_titles.items():
+            season = seasons_by_num[season_number]
+            episode = episodes_by_key.get((season.pk, episode_number))
+            if episode is None:
+                new_episodes.append(Episode(season=season, episode_number=episode_number, title=episode_title))
+            elif episode.title != episode_title:
+                episode.title = episode_title
+                changed_episodes.append(episode)
+        if changed_episodes:
+            Episode.objects.bulk_update(changed_episodes, ['title'], batch_size=self.bulk_batch_size)
+        if new_episodes:
+            # Upsert on (season, episode_number) so a row inserted meanwhile by another run
+            # doesn't abort the savepoint; PostgreSQL and SQLite return the PKs directly.
+            Episode.objects.bulk_create(
+                new_episodes, update_conflicts=True, unique_fields=['season', 'episode_number'],
+                update_fields=['title'], batch_size=self.bulk_batch_size
+            )
+            if all(ep.pk for ep in new_episodes):
+                episodes_by_key.update(((ep.season_id, ep.episode_number), ep) for ep in new_episodes)
+            else:
+                episodes_by_key = {(ep.season_id, ep.episode_number): ep for ep in episodes_qs.all()}
+
+        def resolve_episode(ep_key: EpisodeKey) -> Episode:
+            return episodes_by_key[(seasons_by_num[ep_key[0]].pk, ep_key[1])]
+
+        # Diff against the known URLs, flushed in a single INSERT.
+        new_screenshots = []
+        for ep_key, urls in episode_screenshots.items():
+            episode = resolve_episode(ep_key)
+            for screenshot_url in urls:
+                if screenshot_url not in existing_screenshot_urls:
+                    existing_screenshot_urls.add(screenshot_url)
+                    new_screenshots.append(Screenshot(episode=episode, url=screenshot_url,
+                                                      url_hash=Screenshot.hash_url(screenshot_url)))
+        if new_screenshots:
+            # ignore_conflicts still covers a URL inserted concurrently by another run.
+            Screenshot.objects.bulk_create(new_screenshots, ignore_conflicts=True, batch_size=self.bulk_batch_size)
+
+        new_links = []
+        changed_links = []
+        for (ep_key, translation_pk), staged in staged_links.items():
+            episode = resolve_episode(ep_key) if ep_key else None
+            link_obj = links_by_key.get((episode.pk if episode else None, translation_pk))
+            if link_obj is None:
+                link_obj = MediaSourceLink(
+                    source=kodik_source, media_item=None if episode else media_item,
+                    episode=episode, translation_id=translation_pk, player_link=staged.player_link,
+                    quality_info=staged.quality_info, last_seen_at=check_start_time,
+                    source_specific_id=staged.source_specific_id
+                )
+                new_links.append(link_obj)
+                log_action = "Created"
+            else:
+                link_obj.player_link = staged.player_link
+                link_obj.quality_info = staged.quality_info
+                link_obj.last_seen_at = check_start_time
+                if ep_key is None:
+                    link_obj.source_specific_id = staged.source_specific_id
+                changed_links.append(link_obj)
+                log_action = "Updated"
+            # Checked here so the per-link f-string isn't built at all on normal verbosity.
+            if self.verbosity >= 3:
+                if ep_key:
+                    label = f"Ep Link: S{ep_key[0]}E{ep_key[1]} - {staged.translation_title}"
+                else:
+                    label = f"Main Link: {staged.translation_title}"
+                self._log(f"    {log_action} {label}", verbosity=3)
+        if changed_links:
+            MediaSourceLink.objects.bulk_update(changed_links, LINK_UPDATE_FIELDS, batch_size=self.bulk_batch_size)
+        if new_links:
+            # First ingestion of this item: nothing to reconcile, so stream the rows with COPY where possible.
+            if links_by_key or not self._copy_links(new_links):
+                MediaSourceLink.objects.bulk_create(new_links, batch_size=self.bulk_batch_size)
 
-                    if episodes_list_data and isinstance(episodes_list_data, dict):
-                        for episode_num_str, episode_content in episodes_list_data.items():
-                            try:
-                                episode_number = int(episode_num_str)
-                            except (ValueError, TypeError):
-                                continue
-                            if episode_number <= 0:
-                                continue
-
-                            episode_title = None
-                            episode_link = None
-                            episode_screenshots = []
-
-                            if isinstance(episode_content, str):
-                                episode_link = episode_content
-                            elif isinstance(episode_content, dict):
-                                episode_link = episode_content.get('link')
-                                episode_title = episode_content.get('title')
-                                screenshots_raw = episode_content.get('screenshots')
-                                if isinstance(screenshots_raw, list):
-                                    episode_screenshots = [s for s in screenshots_raw if
-                                                           isinstance(s, str) and s.startswith('http')]
-
-                            episode = None
-                            try:
-                                episode, episode_created = Episode.objects.update_or_create(
-                                    season=season, episode_number=episode_number, defaults={'title': episode_title}
-                                )
-                            except Exception as e:
-                                logger.error(f"Error get/create/update Episode {episode_number} for {season}: {e}")
-                                continue
-
-                            if episode_screenshots:
-                                existing_screenshot_urls = set(episode.screenshots.values_list('url', flat=True))
-                                for screenshot_url in episode_screenshots:
-                                    if screenshot_url not in existing_screenshot_urls:
-                                        try:
-                                            Screenshot.objects.get_or_create(episode=episode, url=screenshot_url)
-                                        except Exception as e:
-                                            logger.error(f"Error saving screenshot {screenshot_url} for {episode}: {e}")
-
-                            if episode_link:
-                                ep_link_defaults = {
-                                    'player_link': episode_link, 'quality_info': variant_quality,
-                                    'last_seen_at': check_start_time
-                                }
-                                ep_link_lookup = {
-                                    'source': kodik_source, 'media_item': None,
-                                    'episode': episode, 'translation': translation_obj
-                                }
-                                try:
-                                    ep_link_obj, ep_created = MediaSourceLink.objects.update_or_create(
-                                        defaults=ep_link_defaults, **ep_link_lookup)
-                                    log_ep_action = "Created" if ep_created else "Updated"
-                                    self._log(
-                                        f"      {log_ep_action} Ep Link: S{season_number}E{episode_number} - {translation_obj.title}",
-                                        verbosity=3)
-                                    processed_link_pks.add(ep_link_obj.pk)
-                                except Exception as e:
-                                    logger.error(
-                                        f"Error saving episode link for {episode}, Translation {translation_obj.title}: {e}")
         if cleanup:
-            stale_links_qs = MediaSourceLink.objects.filter(
-                Q(episode__season__media_item=media_item) | Q(media_item=media_item, episode=None),
-                source=kodik_source
-            ).exclude(pk__in=processed_link_pks)
-            deleted_count, _ = stale_links_qs.delete()
-            if deleted_count > 0:
-                self._log(f"  Cleaned up {deleted_count} stale links for Item {media_item.pk}.",
+            self._cleanup_stale_links(media_item, kodik_source, check_start_time)
+
+        MediaItemSourceMetadata.objects.update_or_create(
+            media_item=media_item, source=kodik_source,
+            defaults={'last_response_hash': parsed.response_hash, 'last_checked_at': check_start_time}
+        )
+        return processed_count
+
+    @staticmethod
+    def _copy_links(links: List[MediaSourceLink]) -> bool:
+        """
+        Inserts links with COPY FROM STDIN on PostgreSQL. Returns False when the fast path does not
+        apply (other backends, small batches), leaving the insert to the caller.
+        Created links get no primary keys, which is fine: stale link cleanup is timestamp-based.
+        """
+        if connection.vendor != 'postgresql' or len(links) < COPY_MIN_ROWS:
+            return False
+        meta = MediaSourceLink._meta
+        fields = [meta.get_field(name) for name in COPY_LINK_FIELDS]
+        added_at = timezone.now()
+        for link in links:
+            link.added_at = added_at  # auto_now_add is only applied by save()/bulk_create
+        rows = [[getattr(link, field.attname) for field in fields] for link in links]
+        sql = 'COPY {} ({}) FROM STDIN'.format(
+            connection.ops.quote_name(meta.db_table),
+            ', '.join(connection.ops.quote_name(field.column) for field in fields)
+        )
+        with connection.cursor() as cursor:
+            raw_cursor = cursor.cursor
+            if hasattr(raw_cursor, 'copy_expert'):  # psycopg2
+                buffer = io.StringIO()
+                for row in rows:
+                    buffer.write(','.join(
+                        r'\N' if value is None else '"{}"'.format(str(value).replace('"', '""')) for value in row
+                    ))
+                    buffer.write('\n')
+                buffer.seek(0)
+                raw_cursor.copy_expert(f"{sql} WITH (FORMAT csv, NULL '\\N')", buffer)
+            else:  # psycopg 3
+                with raw_cursor.copy(sql) as copy:
+                    for row in rows:
+                        copy.write_row(row)
+        return True
+
+    def _cleanup_stale_links(self, media_item: MediaItem, kodik_source: Source, check_start_time: datetime):
+        """
+        Deletes the item's links that this run didn't touch. Every link seen in the response had
+        last_seen_at set to check_start_time, so anything older (or never seen) is stale.
+        """
+        stale_filter = Q(last_seen_at__lt=check_start_time) | Q(last_seen_at__isnull=True)
+        # Two single-path deletes instead of one OR across joins, so each can use its own index.
+        deleted_count = self._delete_links_in_batches(MediaSourceLink.objects.filter(
+            stale_filter, source=kodik_source, episode__season__media_item=media_item))
+        deleted_count += self._delete_links_in_batches(MediaSourceLink.objects.filter(
+            stale_filter, source=kodik_source, media_item=media_item, episode__isnull=True))
+        if deleted_count > 0:
+            self._log(f"  Cleaned up {deleted_count} stale links for Item {media_item.pk}.",
+                      style=self.style.WARNING)
+
+    def _delete_links_in_batches(self, links_qs) -> int:
+        """
+        Deletes the matching links bulk_batch_size at a time and returns how many links went.
+        The ViewingHistory cascade makes Django load every link it deletes, so reading just the PKs
+        and deleting id-only batches keeps that bounded for items that lost many links.
+        """
+        deleted_count = 0
+        # Materialized first: SQLite gives no isolation between an open cursor and deletes on its table.
+        pks = list(links_qs.values_list('pk', flat=True))
+        for start in range(0, len(pks), self.bulk_batch_size):
+            _, deleted_per_model = MediaSourceLink.objects.filter(
+                pk__in=pks[start:start + self.bulk_batch_size]).only('id').delete()
+            deleted_count += deleted_per_model.get(MediaSourceLink._meta.label, 0)
+        return deleted_count
+
+    def _fetch_responses(self, searchable: List[MediaItem], params_list: List[Dict[str, Any]],
+                         fetch_window: Callable[[List[Dict[str, Any]]], List]) -> List[Optional[Dict[str, Any]]]:
+        """
+        Returns one /search response per item. With --fetch-batch-size > 1, items are grouped by
+        their first external ID type and searched with comma-separated IDs; results are split back
+        by that ID. Batches that fail or hit the result limit, and items a batch found nothing for,
+        fall back to one request per item with all of its IDs.
+        """
+        if self.fetch_batch_size <= 1:
+            return fetch_window(params_list)
+
+        groups: Dict[str, List[int]] = defaultdict(list)
+        for index, media_item in enumerate(searchable):
+            field = next(f for f in EXTERNAL_ID_FIELDS if getattr(media_item, f))
+            groups[field].append(index)
+
+        responses: List[Optional[Dict[str, Any]]] = [None] * len(searchable)
+        single_indexes: List[int] = []
+        batches: List[Tuple[str, List[int]]] = []
+        for field, indexes in groups.items():
+            for start in range(0, len(indexes), self.fetch_batch_size):
+                chunk = indexes[start:start + self.fetch_batch_size]
+                if len(chunk) == 1:
+                    single_indexes.extend(chunk)
+                else:
+                    batches.append((field, chunk))
+
+        batch_params = [
+            {field: ','.join(str(getattr(searchable[i], field)) for i in chunk), **SEARCH_EXTRA_PARAMS}
+            for field, chunk in batches
+        ]
+        for (field, chunk), response_data in zip(batches, fetch_window(batch_params)):
+            results = response_data.get('results') if response_data else None
+            # A truncated batch would look like deleted translations for some items; refetch those singly.
+            if results is None or response_data.get('total', len(results)) > len(results):
+                single_indexes.extend(chunk)
+                continue
+            results_by_id: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+            for result in results:
+                results_by_id[str(result.get(RESULT_ID_KEYS[field]))].append(result)
+            for i in chunk:
+                item_results = results_by_id.get(str(getattr(searchable[i], field)))
+                if item_results:
+                    responses[i] = {'results': item_results}
+                else:
+                    # Only the first ID was searched; an empty answer must not read as "no translations".
+                    single_indexes.append(i)
+
+        if single_indexes:
+            single_responses = fetch_window([params_list[i] for i in single_indexes])
+            for i, response_data in zip(single_indexes, single_responses):
+                responses[i] = response_data
+        return responses
+
+    def _process_window(self, media_items: List[MediaItem], fetch_window: Callable[[List[Dict[str, Any]]], List],
+                        kodik_source: Source, translation_map: TranslationMap, cleanup: bool) -> int:
+        """Fetches search results for a window of items concurrently and processes each one."""
+        searchable = []
+        params_list = []
+        for media_item in media_items:
+            search_params = self._get_search_params(media_item)
+            if search_params is None:
+                self._log(f"  Skipping Item {media_item.pk}: No external IDs found for search.",
                           style=self.style.WARNING)
+                continue
+            if self.verbosity >= 3:
+                self._log(f"  Searching Kodik for Item {media_item.pk} using: {search_params}", verbosity=3)
+            searchable.append(media_item)
+            params_list.append(search_params)
+        if not params_list:
+            return 0
+
+        responses = self._fetch_responses(searchable, params_list, fetch_window)
+        previous_hashes = dict(MediaItemSourceMetadata.objects.filter(
+            media_item__in=searchable, source=kodik_source
+        ).values_list('media_item_id', 'last_response_hash'))
+
+        # Parse before opening the transaction so it only spans the writes.
+        parsed_items = []
+        for media_item, response_data in zip(searchable, responses):
+            self._log(f"Processing MediaItem PK {media_item.pk}: '{media_item.title}'", verbosity=2)
+            if response_data is None or 'results' not in response_data:
+                self._log(f"  Failed to fetch search results for Item {media_item.pk}. Check logs.",
+                          style=self.style.ERROR)
+                continue
+            try:
+                parsed_items.append((media_item, self._parse_search_results(
+                    media_item, response_data.get('results') or [], translation_map)))
+            except Exception:
+                logger.exception(f"Critical error parsing results for MediaItem PK {media_item.pk}. Skipping.")
 
+        processed_count = 0
+        # One commit per window; each item gets a savepoint so a failing item doesn't roll back the rest.
+        with transaction.atomic():
+            for media_item, parsed in parsed_items:
+                try:
+                    with transaction.atomic():
+                        processed_count += self._process_media_item(
+                            media_item, parsed, kodik_source, cleanup, previous_hashes.get(media_item.pk)
+                        )
+                except Exception:
+                    logger.exception(f"Critical error processing MediaItem PK {media_item.pk}. Skipping.")
         return processed_count
 
     def handle(self, *args, **options):
@@ -227,8 +673,15 @@ class Command(BaseCommand):
         pk_list = options['pk']
         process_all = options['all']
         limit = options['limit']
+        random_sample = options['random']
         skip_hours = options['skip_recently_updated_meta']
+        skip_checked_hours = options['skip_checked_within']
         cleanup = options['cleanup']
+        concurrency = max(options['concurrency'], 1)
+        batch_size = max(options['batch_size'], 1)
+        self.fetch_batch_size = max(options['fetch_batch_size'], 1)
+        # Long serials produce thousands of rows per item; keep each statement bounded.
+        self.bulk_batch_size = max(getattr(settings, 'JUST_MEDIA_BULK_BATCH_SIZE', 500), 1)
 
         if not pk_list and not process_all:
             raise CommandError("Please specify at least one MediaItem PK using --pk or use --all.")
@@ -247,49 +700,86 @@ class Command(BaseCommand):
             self._log("Warning: Translation table is empty. Run 'populate_translations' first.", self.style.WARNING)
 
         media_items_qs = MediaItem.objects.none()
+        total_items_to_process = None
+        pk_items: Optional[List[MediaItem]] = None
         if pk_list:
-            media_items_qs = MediaItem.objects.filter(pk__in=pk_list)
-            if media_items_qs.count() != len(pk_list):
-                found_pks = set(media_items_qs.values_list('pk', flat=True))
-                missing_pks = set(pk_list) - found_pks
+            # A single query: the fetched rows give the missing PKs, the total, and the items to process.
+            pk_items = list(MediaItem.objects.filter(pk__in=pk_list).only(*ITEM_FIELDS).order_by('pk'))
+            missing_pks = set(pk_list) - {media_item.pk for media_item in pk_items}
+            if missing_pks:
                 self._log(f"Warning: Could not find MediaItems with PKs: {missing_pks}", self.style.WARNING)
+            total_items_to_process = len(pk_items)
         elif process_all:
-            media_items_qs = MediaItem.objects.all()
+            # Items without any external ID can't be searched; keep them in the database.
+            media_items_qs = MediaItem.objects.filter(HAS_EXTERNAL_ID)
             if skip_hours is not None:
                 skip_time = timezone.now() - timedelta(hours=skip_hours)
-                latest_meta_update = MediaItemSourceMetadata.objects.filter(
+                # NOT EXISTS in WHERE lets the planner use an anti-join instead of a per-row subquery.
+                recently_updated_meta = MediaItemSourceMetadata.objects.filter(
                     media_item=OuterRef('pk'),
-                    source=kodik_source
-                ).values('source_last_updated_at')[:1]
-                media_items_qs = media_items_qs.annotate(
-                    kodik_meta_updated_at=Subquery(latest_meta_update)
-                ).filter(
-                    Q(kodik_meta_updated_at__isnull=True) | Q(kodik_meta_updated_at__lt=skip_time)
+                    source=kodik_source,
+                    source_last_updated_at__gte=skip_time
                 )
+                media_items_qs = media_items_qs.exclude(Exists(recently_updated_meta))
                 self._log(f"Processing items whose metadata was updated before {skip_time} or never.", verbosity=1)
-            # Random order significantly slows down pagination on large tables
-            # Use default ordering or pk ordering instead if performance is an issue
-            # media_items_qs = media_items_qs.order_by('?')
-            media_items_qs = media_items_qs.order_by('pk')
-            if limit:
-                media_items_qs = media_items_qs[:limit]
-
-        total_items_to_process = media_items_qs.count()
+            if skip_checked_hours is not None:
+                checked_since = timezone.now() - timedelta(hours=skip_checked_hours)
+                recently_checked_meta = MediaItemSourceMetadata.objects.filter(
+                    media_item=OuterRef('pk'),
+                    source=kodik_source,
+                    last_checked_at__gte=checked_since
+                )
+                media_items_qs = media_items_qs.exclude(Exists(recently_checked_meta))
+                self._log(f"Skipping items whose translations were fetched after {checked_since}.", verbosity=1)
+            if random_sample and limit:
+                # Sample PKs in Python instead of ORDER BY random(), which sorts the whole table.
+                candidate_pks = list(media_items_qs.values_list('pk', flat=True))
+                sampled_pks = random.sample(candidate_pks, min(limit, len(candidate_pks)))
+                media_items_qs = MediaItem.objects.filter(pk__in=sampled_pks).order_by('pk')
+                total_items_to_process = len(sampled_pks)
+            else:
+                media_items_qs = media_items_qs.order_by('pk')
+                if limit:
+                    media_items_qs = media_items_qs[:limit]
+
+        if total_items_to_process is None:
+            total_items_to_process = media_items_qs.count()
         self._log(f"Found {total_items_to_process} MediaItems to process.", verbosity=1)
 
         processed_count = 0
-        items_iterable = media_items_qs
+        if pk_items is not None:
+            items_iterable = pk_items
+        else:
+            # Stream rows (server-side cursor on PostgreSQL) so --all doesn't load the whole table up front.
+            # chunk_size is honoured with or without server-side cursors (e.g. behind pgBouncer).
+            items_iterable = media_items_qs.only(*ITEM_FIELDS).iterator(
+                chunk_size=max(self.bulk_batch_size, batch_size))
         if TQDM_AVAILABLE and self.verbosity == 1:
-            items_iterable = tqdm(media_items_qs, total=total_items_to_process, desc="Updating Translations",
+            items_iterable = tqdm(items_iterable, total=total_items_to_process, desc="Updating Translations",
                                   unit="item")
 
-        for media_item in items_iterable:
-            try:
-                processed_count += self._process_media_item(
-                    media_item, kodik_source, client, translation_map, cleanup
-                )
-            except Exception as e:
-                logger.exception(f"Critical error processing MediaItem PK {media_item.pk}. Skipping.")
+        # One event loop and one pooled AsyncClient for the whole run, so keep-alive
+        # connections carry over from one window to the next.
+        loop = asyncio.new_event_loop()
+        session = client.async_session(max_connections=concurrency)
+
+        def fetch_window(params_list: List[Dict[str, Any]]) -> List[Optional[Dict[str, Any]]]:
+            return loop.run_until_complete(self._fetch_search_results(client, session, params_list, concurrency))
+
+        # Fetch a window of items concurrently, then persist them one by one on this thread.
+        try:
+            window = []
+            for media_item in items_iterable:
+                window.append(media_item)
+                if len(window) >= batch_size:
+                    processed_count += self._process_window(window, fetch_window, kodik_source, translation_map,
+                                                            cleanup)
+                    window = []
+            if window:
+                processed_count += self._process_window(window, fetch_window, kodik_source, translation_map, cleanup)
+        finally:
+            loop.run_until_complete(session.aclose())
+            loop.close()
 
         self._log(f"\nFinished update. Processed/Attempted {processed_count} / {total_items_to_process} items.",
                   self.style.SUCCESS)
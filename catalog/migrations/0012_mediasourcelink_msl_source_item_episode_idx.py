@@ -0,0 +1,17 @@
+# Generated by Django 5.1.8 on 2026-10-16 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0011_remove_mediaitem_unique_kinopoisk_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediasourcelink',
+            index=models.Index(fields=['source', 'media_item', 'episode'], name='msl_source_item_episode_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.8 on 2026-10-16 10:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0012_mediasourcelink_msl_source_item_episode_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaitemsourcemetadata',
+            name='last_response_hash',
+            field=models.CharField(blank=True, help_text='Digest of the last search response processed for this item', max_length=32, null=True, verbose_name='Last Response Hash'),
+        ),
+    ]
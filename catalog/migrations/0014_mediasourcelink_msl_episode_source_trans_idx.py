@@ -0,0 +1,17 @@
+# Generated by Django 5.1.8 on 2026-10-16 10:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0013_mediaitemsourcemetadata_last_response_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediasourcelink',
+            index=models.Index(fields=['episode', 'source', 'translation'], name='msl_episode_source_trans_idx'),
+        ),
+    ]
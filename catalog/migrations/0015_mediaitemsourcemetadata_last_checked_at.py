@@ -0,0 +1,18 @@
+# Generated by Django 5.1.8 on 2026-10-16 11:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0014_mediasourcelink_msl_episode_source_trans_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediaitemsourcemetadata',
+            name='last_checked_at',
+            field=models.DateTimeField(blank=True, db_index=True, help_text='When translations for this item were last fetched from this source', null=True, verbose_name='Last Checked At'),
+        ),
+    ]
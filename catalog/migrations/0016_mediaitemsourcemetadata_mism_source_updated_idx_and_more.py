@@ -0,0 +1,21 @@
+# Generated by Django 5.1.8 on 2026-10-16 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0015_mediaitemsourcemetadata_last_checked_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediaitemsourcemetadata',
+            index=models.Index(fields=['source', 'source_last_updated_at'], name='mism_source_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaitemsourcemetadata',
+            index=models.Index(fields=['source', 'last_checked_at'], name='mism_source_checked_idx'),
+        ),
+    ]
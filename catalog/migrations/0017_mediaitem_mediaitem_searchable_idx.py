@@ -0,0 +1,17 @@
+# Generated by Django 5.1.8 on 2026-10-16 12:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0016_mediaitemsourcemetadata_mism_source_updated_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(condition=models.Q(models.Q(('kinopoisk_id__isnull', False), models.Q(('kinopoisk_id', ''), _negated=True)), models.Q(('imdb_id__isnull', False), models.Q(('imdb_id', ''), _negated=True)), models.Q(('shikimori_id__isnull', False), models.Q(('shikimori_id', ''), _negated=True)), models.Q(('mydramalist_id__isnull', False), models.Q(('mydramalist_id', ''), _negated=True)), _connector='OR'), fields=['id'], name='mediaitem_searchable_idx'),
+        ),
+    ]
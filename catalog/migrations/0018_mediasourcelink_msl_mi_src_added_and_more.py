@@ -0,0 +1,26 @@
+# Generated by Django 5.1.8 on 2026-10-16 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0017_mediaitem_mediaitem_searchable_idx'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediasourcelink',
+            name='source_specific_id',
+            field=models.CharField(blank=True, help_text="ID of the content within the source system (e.g., 'movie-12345')", max_length=100, null=True, verbose_name='Source Specific ID'),
+        ),
+        migrations.AddIndex(
+            model_name='mediasourcelink',
+            index=models.Index(fields=['media_item', 'source', '-added_at'], name='msl_mi_src_added'),
+        ),
+        migrations.AddIndex(
+            model_name='mediasourcelink',
+            index=models.Index(fields=['source', 'source_specific_id'], name='msl_src_sid'),
+        ),
+    ]
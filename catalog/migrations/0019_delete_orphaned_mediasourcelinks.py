@@ -0,0 +1,22 @@
+# Generated by Django 5.1.8 on 2026-10-16 13:39
+
+from django.db import migrations
+
+
+def delete_orphaned_links(apps, schema_editor):
+    """Links with neither a media item nor an episode can't satisfy the new constraint (nor be played)."""
+    MediaSourceLink = apps.get_model('catalog', 'MediaSourceLink')
+    MediaSourceLink.objects.filter(media_item__isnull=True, episode__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0018_mediasourcelink_msl_mi_src_added_and_more'),
+    ]
+
+    # Kept apart from the check constraint: on PostgreSQL deleting links that ViewingHistory references
+    # queues deferred FK trigger events, and altering the table later in the same transaction fails on them.
+    operations = [
+        migrations.RunPython(delete_orphaned_links, migrations.RunPython.noop),
+    ]
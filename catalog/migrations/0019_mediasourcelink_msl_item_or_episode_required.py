@@ -0,0 +1,17 @@
+# Generated by Django 5.1.8 on 2026-10-16 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0019_delete_orphaned_mediasourcelinks'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='mediasourcelink',
+            constraint=models.CheckConstraint(condition=models.Q(('media_item__isnull', False), ('episode__isnull', False), _connector='OR'), name='msl_item_or_episode_required'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.8 on 2026-10-16 14:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0019_mediasourcelink_msl_item_or_episode_required'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterUniqueTogether(
+            name='viewinghistory',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='viewinghistory',
+            constraint=models.UniqueConstraint(fields=('user', 'link'), name='vh_user_link_uniq'),
+        ),
+    ]
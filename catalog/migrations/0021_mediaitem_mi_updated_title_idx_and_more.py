@@ -0,0 +1,21 @@
+# Generated by Django 5.1.8 on 2026-10-16 14:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0020_alter_viewinghistory_unique_together_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(fields=['-updated_at', 'title'], name='mi_updated_title_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(fields=['media_type', '-updated_at'], name='mi_type_updated_idx'),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.1.8 on 2026-10-16 14:50
+
+import hashlib
+
+from django.db import migrations, models
+
+
+def fill_url_hashes(apps, schema_editor):
+    Screenshot = apps.get_model('catalog', 'Screenshot')
+    batch = []
+    for screenshot in Screenshot.objects.only('id', 'url').iterator(chunk_size=2000):
+        screenshot.url_hash = hashlib.blake2b(screenshot.url.encode(), digest_size=16).digest()
+        batch.append(screenshot)
+        if len(batch) >= 2000:
+            Screenshot.objects.bulk_update(batch, ['url_hash'])
+            batch = []
+    if batch:
+        Screenshot.objects.bulk_update(batch, ['url_hash'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0021_mediaitem_mi_updated_title_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='screenshot',
+            name='url_hash',
+            field=models.BinaryField(editable=False, max_length=16, null=True, verbose_name='URL Hash'),
+        ),
+        migrations.RunPython(fill_url_hashes, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='screenshot',
+            name='url_hash',
+            field=models.BinaryField(editable=False, max_length=16, verbose_name='URL Hash'),
+        ),
+        migrations.AlterField(
+            model_name='screenshot',
+            name='url',
+            field=models.URLField(max_length=1024, verbose_name='URL'),
+        ),
+        migrations.AddConstraint(
+            model_name='screenshot',
+            constraint=models.UniqueConstraint(fields=('url_hash',), name='screenshot_url_hash_uniq'),
+        ),
+    ]
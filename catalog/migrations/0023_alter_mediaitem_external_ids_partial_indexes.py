@@ -0,0 +1,49 @@
+# Generated by Django 5.1.8 on 2026-10-16 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0022_screenshot_url_hash'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='mediaitem',
+            name='kinopoisk_id',
+            field=models.CharField(blank=True, max_length=20, null=True, verbose_name='Kinopoisk ID'),
+        ),
+        migrations.AlterField(
+            model_name='mediaitem',
+            name='imdb_id',
+            field=models.CharField(blank=True, max_length=20, null=True, verbose_name='IMDb ID'),
+        ),
+        migrations.AlterField(
+            model_name='mediaitem',
+            name='shikimori_id',
+            field=models.CharField(blank=True, max_length=20, null=True, verbose_name='Shikimori ID'),
+        ),
+        migrations.AlterField(
+            model_name='mediaitem',
+            name='mydramalist_id',
+            field=models.CharField(blank=True, max_length=20, null=True, verbose_name='MyDramaList ID'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(condition=models.Q(('kinopoisk_id__isnull', False)), fields=['kinopoisk_id'], name='mi_kp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(condition=models.Q(('imdb_id__isnull', False)), fields=['imdb_id'], name='mi_imdb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(condition=models.Q(('shikimori_id__isnull', False)), fields=['shikimori_id'], name='mi_shiki_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='mediaitem',
+            index=models.Index(condition=models.Q(('mydramalist_id__isnull', False)), fields=['mydramalist_id'], name='mi_mdl_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.8 on 2026-10-16 15:46
+
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_media_item(apps, schema_editor):
+    """Episode links point at their season's item, item-level links at their own media item."""
+    MediaSourceLink = apps.get_model('catalog', 'MediaSourceLink')
+    ViewingHistory = apps.get_model('catalog', 'ViewingHistory')
+    links = MediaSourceLink.objects.filter(pk=OuterRef('link_id'))
+    ViewingHistory.objects.update(media_item_id=Coalesce(
+        Subquery(links.values('episode__season__media_item_id')[:1]),
+        Subquery(links.values('media_item_id')[:1]),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0024_viewinghistory_media_item'),
+    ]
+
+    # Kept apart from the AddField/AddIndex: on PostgreSQL this UPDATE queues deferred FK trigger events,
+    # and creating an index later in the same transaction fails on them.
+    operations = [
+        migrations.RunPython(fill_media_item, migrations.RunPython.noop),
+    ]
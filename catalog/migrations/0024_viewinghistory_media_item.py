@@ -0,0 +1,25 @@
+# Generated by Django 5.1.8 on 2026-10-16 15:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0023_alter_mediaitem_external_ids_partial_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='viewinghistory',
+            name='media_item',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='catalog.mediaitem', verbose_name='Media Item'),
+        ),
+        migrations.AddIndex(
+            model_name='viewinghistory',
+            index=models.Index(fields=['user', 'media_item', '-watched_at'], name='vh_user_item_watched_idx'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.1.8 on 2026-10-16 16:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0024_fill_viewinghistory_media_item'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='episode',
+            options={'verbose_name': 'Episode', 'verbose_name_plural': 'Episodes'},
+        ),
+        migrations.AlterModelOptions(
+            name='mediaitemsourcemetadata',
+            options={'verbose_name': 'Media Item Source Metadata', 'verbose_name_plural': 'Media Item Source Metadata'},
+        ),
+        migrations.AlterModelOptions(
+            name='mediasourcelink',
+            options={'verbose_name': 'Media Source Link', 'verbose_name_plural': 'Media Source Links'},
+        ),
+        migrations.AlterModelOptions(
+            name='screenshot',
+            options={'verbose_name': 'Screenshot', 'verbose_name_plural': 'Screenshots'},
+        ),
+        migrations.AlterModelOptions(
+            name='season',
+            options={'verbose_name': 'Season', 'verbose_name_plural': 'Seasons'},
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.8 on 2026-10-16 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0025_alter_episode_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='translation',
+            name='kodik_id',
+            field=models.PositiveIntegerField(unique=True, verbose_name='Kodik Translation ID'),
+        ),
+        migrations.AlterField(
+            model_name='mediaitem',
+            name='media_type',
+            field=models.CharField(choices=[('movie', 'Movie'), ('tv_show', 'TV Show'), ('anime_movie', 'Anime Movie'), ('anime_series', 'Anime Series'), ('cartoon_movie', 'Cartoon Movie'), ('cartoon_series', 'Cartoon Series'), ('documentary_movie', 'Documentary Movie'), ('documentary_series', 'Documentary Series'), ('unknown', 'Unknown')], default='unknown', max_length=30, verbose_name='Media Type'),
+        ),
+        migrations.AlterField(
+            model_name='mediasourcelink',
+            name='last_seen_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Last Seen At'),
+        ),
+        migrations.AlterField(
+            model_name='mediaitemsourcemetadata',
+            name='source_last_updated_at',
+            field=models.DateTimeField(blank=True, help_text='Timestamp of the last update received from this source for this item', null=True, verbose_name='Source Last Updated At'),
+        ),
+        migrations.AlterField(
+            model_name='mediaitemsourcemetadata',
+            name='last_checked_at',
+            field=models.DateTimeField(blank=True, help_text='When translations for this item were last fetched from this source', null=True, verbose_name='Last Checked At'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.8 on 2026-10-16 17:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0026_drop_redundant_single_column_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='mediasourcelink',
+            index=models.Index(fields=['-added_at', 'source'], name='msl_added_src_idx'),
+        ),
+    ]
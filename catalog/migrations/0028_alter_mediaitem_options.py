@@ -0,0 +1,17 @@
+# Generated by Django 5.1.8 on 2026-10-16 17:40
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0027_mediasourcelink_msl_added_src_idx'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='mediaitem',
+            options={'verbose_name': 'Media Item', 'verbose_name_plural': 'Media Items'},
+        ),
+    ]
@@ -1,11 +1,28 @@
 # catalog/models.py
+import hashlib
+import time
 # Import CMSPlugin for plugin models
 from cms.models.pluginmodel import CMSPlugin
 from django.conf import settings
 from django.core.exceptions import ValidationError
+from functools import lru_cache
+
 from django.db import models
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.urls import reverse
-from django.utils.translation import gettext_lazy as _
+from django.utils import translation
+from django.utils.translation import gettext, gettext_noop, gettext_lazy as _
+
+
+# External IDs a MediaItem can be looked up by in the sources' search APIs.
+EXTERNAL_ID_FIELDS = ('kinopoisk_id', 'imdb_id', 'shikimori_id', 'mydramalist_id')
+HAS_EXTERNAL_ID = (
+    (models.Q(kinopoisk_id__isnull=False) & ~models.Q(kinopoisk_id=''))
+    | (models.Q(imdb_id__isnull=False) & ~models.Q(imdb_id=''))
+    | (models.Q(shikimori_id__isnull=False) & ~models.Q(shikimori_id=''))
+    | (models.Q(mydramalist_id__isnull=False) & ~models.Q(mydramalist_id=''))
+)
 
 
 class Genre(models.Model):
@@ -48,7 +65,7 @@ class Source(models.Model):
 
 class Translation(models.Model):
     """ Represents a specific translation/voiceover studio from Kodik. """
-    kodik_id = models.PositiveIntegerField(_("Kodik Translation ID"), unique=True, db_index=True)
+    kodik_id = models.PositiveIntegerField(_("Kodik Translation ID"), unique=True)
     title = models.CharField(_("Title"), max_length=150, db_index=True)
 
     class Meta:
@@ -60,6 +77,38 @@ class Translation(models.Model):
         return f"{self.title} (ID: {self.kodik_id})"
 
 
+# Seconds other processes may keep showing a stale title: bulk upserts send no signals to them.
+TRANSLATION_CACHE_TTL = 300
+
+
+@lru_cache(maxsize=1024)
+def _translation_by_id(pk, ttl_bucket):
+    """
+    In-process cache of the few hundred studios. Callers pass the current ttl_bucket
+    (see _translation_ttl_bucket), so entries expire; cleared whenever a Translation is saved here.
+    """
+    return Translation.objects.only('id', 'title', 'kodik_id').get(pk=pk)
+
+
+def _translation_ttl_bucket():
+    return int(time.monotonic() // TRANSLATION_CACHE_TTL)
+
+
+@receiver(post_save, sender=Translation)
+@receiver(post_delete, sender=Translation)
+def clear_translation_cache(sender, **kwargs):
+    """Drops cached translations after any change to the table."""
+    _translation_by_id.cache_clear()
+
+
+class MediaItemQuerySet(models.QuerySet):
+    def for_list(self):
+        """Loads only the columns a media card renders and prefetches its genres in one query."""
+        return self.only('id', 'title', 'release_year', 'media_type', 'poster_url', 'updated_at').prefetch_related(
+            models.Prefetch('genres', queryset=Genre.objects.only('id', 'name'))
+        )
+
+
 class MediaItem(models.Model):
     class MediaType(models.TextChoices):
         """Generic media type choices."""
@@ -73,19 +122,22 @@ class MediaItem(models.Model):
         DOCUMENTARY_SERIES = 'documentary_series', _('Documentary Series')
         UNKNOWN = 'unknown', _('Unknown')
 
+    # Lazy labels by value; built once instead of walking the field choices per __str__ or display call.
+    _MEDIA_TYPE_LABELS = dict(MediaType.choices)
+
     title = models.CharField(_("Title"), max_length=255)
     original_title = models.CharField(_("Original Title"), max_length=255, blank=True, null=True)
     media_type = models.CharField(
-        _("Media Type"), max_length=30, choices=MediaType.choices, default=MediaType.UNKNOWN, db_index=True
+        _("Media Type"), max_length=30, choices=MediaType.choices, default=MediaType.UNKNOWN
     )
     release_year = models.PositiveIntegerField(_("Release Year"), blank=True, null=True, db_index=True)
     description = models.TextField(_("Description"), blank=True, null=True)
     poster_url = models.URLField(_("Poster URL"), max_length=1024, blank=True, null=True)
 
-    kinopoisk_id = models.CharField(_("Kinopoisk ID"), max_length=20, blank=True, null=True, db_index=True)
-    imdb_id = models.CharField(_("IMDb ID"), max_length=20, blank=True, null=True, db_index=True)
-    shikimori_id = models.CharField(_("Shikimori ID"), max_length=20, blank=True, null=True, db_index=True)
-    mydramalist_id = models.CharField(_("MyDramaList ID"), max_length=20, blank=True, null=True, db_index=True)
+    kinopoisk_id = models.CharField(_("Kinopoisk ID"), max_length=20, blank=True, null=True)
+    imdb_id = models.CharField(_("IMDb ID"), max_length=20, blank=True, null=True)
+    shikimori_id = models.CharField(_("Shikimori ID"), max_length=20, blank=True, null=True)
+    mydramalist_id = models.CharField(_("MyDramaList ID"), max_length=20, blank=True, null=True)
 
     genres = models.ManyToManyField(Genre, verbose_name=_("Genres"), blank=True, related_name="media_items")
     countries = models.ManyToManyField(Country, verbose_name=_("Countries"), blank=True, related_name="media_items")
@@ -93,28 +145,59 @@ class MediaItem(models.Model):
     created_at = models.DateTimeField(_("Created At"), auto_now_add=True)
     updated_at = models.DateTimeField(_("Updated At"), auto_now=True)
 
+    objects = MediaItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Media Item")
         verbose_name_plural = _("Media Items")
-        ordering = ['-updated_at', 'title']
+        indexes = [
+            # Lets PK-ordered scans over searchable items skip rows without any external ID.
+            models.Index(fields=['id'], condition=HAS_EXTERNAL_ID, name='mediaitem_searchable_idx'),
+            # Matches the display order ('-updated_at', 'title'), so list pages and the Latest plugin read
+            # the index in order.
+            models.Index(fields=['-updated_at', 'title'], name='mi_updated_title_idx'),
+            # Criteria plugin: filter by type, newest first.
+            models.Index(fields=['media_type', '-updated_at'], name='mi_type_updated_idx'),
+            # Partial: most items lack some of the IDs, and an equality lookup implies IS NOT NULL.
+            models.Index(fields=['kinopoisk_id'], condition=models.Q(kinopoisk_id__isnull=False), name='mi_kp_idx'),
+            models.Index(fields=['imdb_id'], condition=models.Q(imdb_id__isnull=False), name='mi_imdb_idx'),
+            models.Index(fields=['shikimori_id'], condition=models.Q(shikimori_id__isnull=False), name='mi_shiki_idx'),
+            models.Index(fields=['mydramalist_id'], condition=models.Q(mydramalist_id__isnull=False),
+                         name='mi_mdl_idx'),
+        ]
 
     def __str__(self):
         year_str = f" ({self.release_year})" if self.release_year else ""
-        return f"{self.title}{year_str} [{self.get_media_type_display()}]"
+        label = self._MEDIA_TYPE_LABELS.get(self.media_type, self.media_type)
+        return f"{self.title}{year_str} [{label}]"
+
+    def get_media_type_display(self):
+        """Same result as Django's generated method, which rebuilds a dict of the choices on every call."""
+        return str(self._MEDIA_TYPE_LABELS.get(self.media_type, self.media_type))
 
     def get_absolute_url(self):
         return reverse('catalog:mediaitem_detail', kwargs={'pk': self.pk})
 
 
+class SeasonQuerySet(models.QuerySet):
+    def with_display(self):
+        """Joins and loads only what __str__ and admin links render, skipping the item's text columns."""
+        return self.select_related('media_item').only(
+            'media_item_id', 'season_number',
+            'media_item__title', 'media_item__release_year', 'media_item__media_type'
+        )
+
+
 class Season(models.Model):
     media_item = models.ForeignKey(MediaItem, on_delete=models.CASCADE, related_name='seasons',
                                    verbose_name=_("Media Item"))
     season_number = models.IntegerField(_("Season Number"), db_index=True)
 
+    objects = SeasonQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Season")
         verbose_name_plural = _("Seasons")
-        ordering = ['media_item', 'season_number']
         unique_together = ('media_item', 'season_number')
 
     def __str__(self):
@@ -128,15 +211,25 @@ class Season(models.Model):
         return f"{media_title} - {season_str}"
 
 
+class EpisodeQuerySet(models.QuerySet):
+    def with_display(self):
+        """Joins and loads only what __str__ and admin links render, skipping the item's text columns."""
+        return self.select_related('season__media_item').only(
+            'season_id', 'episode_number', 'title',
+            'season__media_item_id', 'season__season_number', 'season__media_item__title'
+        )
+
+
 class Episode(models.Model):
     season = models.ForeignKey(Season, on_delete=models.CASCADE, related_name='episodes', verbose_name=_("Season"))
     episode_number = models.PositiveIntegerField(_("Episode Number"))
     title = models.CharField(_("Title"), max_length=255, blank=True, null=True)
 
+    objects = EpisodeQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("Episode")
         verbose_name_plural = _("Episodes")
-        ordering = ['season', 'episode_number']
         unique_together = ('season', 'episode_number')
 
     def __str__(self):
@@ -163,26 +256,56 @@ class MediaSourceLink(models.Model):
 
     quality_info = models.CharField(_("Quality Info"), max_length=50, blank=True, null=True,
                                     help_text=_("Quality reported by the source (e.g., '720p', 'HDTVRip')"))
-    source_specific_id = models.CharField(_("Source Specific ID"), max_length=100, blank=True, null=True, db_index=True,
+    source_specific_id = models.CharField(_("Source Specific ID"), max_length=100, blank=True, null=True,
                                           help_text=_(
                                               "ID of the content within the source system (e.g., 'movie-12345')"))
-    last_seen_at = models.DateTimeField(_("Last Seen At"), blank=True, null=True, db_index=True)
+    last_seen_at = models.DateTimeField(_("Last Seen At"), blank=True, null=True)
     added_at = models.DateTimeField(_("Added At"), auto_now_add=True)
 
     class Meta:
         verbose_name = _("Media Source Link")
         verbose_name_plural = _("Media Source Links")
-        ordering = ['-added_at']
+        indexes = [
+            models.Index(fields=['source', 'media_item', 'episode'], name='msl_source_item_episode_idx'),
+            models.Index(fields=['episode', 'source', 'translation'], name='msl_episode_source_trans_idx'),
+            # Item-level links of a source, newest first (the detail page's main links).
+            models.Index(fields=['media_item', 'source', '-added_at'], name='msl_mi_src_added'),
+            # Replaces the single-column source_specific_id index; lookups are always per source.
+            models.Index(fields=['source', 'source_specific_id'], name='msl_src_sid'),
+            # Newest links across all items (the admin changelist's default ordering).
+            models.Index(fields=['-added_at', 'source'], name='msl_added_src_idx'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(media_item__isnull=False) | models.Q(episode__isnull=False),
+                name='msl_item_or_episode_required'
+            ),
+        ]
 
     def clean(self):
-        if self.media_item is None and self.episode is None:
+        if self.media_item_id is None and self.episode_id is None:
             raise ValidationError(_("A source link must be associated with either a Media Item or an Episode."))
-        if self.media_item and self.episode and self.episode.season.media_item != self.media_item:
-            raise ValidationError(_("The selected Episode does not belong to the selected Media Item."))
+        if self.media_item_id and self.episode_id:
+            # Rare case of both targets set: compare IDs from one row instead of loading the episode's chain.
+            episode_item_id = Episode.objects.filter(pk=self.episode_id).values_list(
+                'season__media_item_id', flat=True
+            ).first()
+            if episode_item_id != self.media_item_id:
+                raise ValidationError(_("The selected Episode does not belong to the selected Media Item."))
+
+    @property
+    def target_media_item_id(self):
+        """PK of the media item this link plays, for item-level and episode links alike."""
+        return self.episode.season.media_item_id if self.episode_id else self.media_item_id
 
     def __str__(self):
         target = self.episode if self.episode else self.media_item
-        trans = f" ({self.translation.title})" if self.translation else ""
+        trans = ""
+        if self.translation_id:
+            # Use a select_related translation if there is one, otherwise the cache instead of a query.
+            translation = (self.translation if MediaSourceLink.translation.is_cached(self)
+                           else _translation_by_id(self.translation_id, _translation_ttl_bucket()))
+            trans = f" ({translation.title})"
         return f"Link from {self.source.name} for {target}{trans}"
 
 
@@ -194,15 +317,26 @@ class MediaItemSourceMetadata(models.Model):
         Source, on_delete=models.CASCADE, related_name='media_metadata', verbose_name=_("Source")
     )
     source_last_updated_at = models.DateTimeField(
-        _("Source Last Updated At"), blank=True, null=True, db_index=True,
+        _("Source Last Updated At"), blank=True, null=True,
         help_text=_("Timestamp of the last update received from this source for this item")
     )
+    last_response_hash = models.CharField(
+        _("Last Response Hash"), max_length=32, blank=True, null=True,
+        help_text=_("Digest of the last search response processed for this item")
+    )
+    last_checked_at = models.DateTimeField(
+        _("Last Checked At"), blank=True, null=True,
+        help_text=_("When translations for this item were last fetched from this source")
+    )
 
     class Meta:
         verbose_name = _("Media Item Source Metadata")
         verbose_name_plural = _("Media Item Source Metadata")
         unique_together = ('media_item', 'source')
-        ordering = ['media_item', 'source']
+        indexes = [
+            models.Index(fields=['source', 'source_last_updated_at'], name='mism_source_updated_idx'),
+            models.Index(fields=['source', 'last_checked_at'], name='mism_source_checked_idx'),
+        ]
 
     def __str__(self):
         updated_str = self.source_last_updated_at.strftime(
@@ -214,19 +348,46 @@ class Screenshot(models.Model):
     episode = models.ForeignKey(
         Episode, on_delete=models.CASCADE, related_name='screenshots', verbose_name=_("Episode")
     )
-    url = models.URLField(_("URL"), max_length=1024, unique=True)
+    url = models.URLField(_("URL"), max_length=1024)
+    # URLs are unique through this 16-byte digest: a far smaller index than one over the URL itself.
+    url_hash = models.BinaryField(_("URL Hash"), max_length=16, editable=False)
 
     class Meta:
         verbose_name = _("Screenshot")
         verbose_name_plural = _("Screenshots")
-        ordering = ['episode', 'id']
+        constraints = [
+            models.UniqueConstraint(fields=['url_hash'], name='screenshot_url_hash_uniq'),
+        ]
 
     def __str__(self):
         return f"Screenshot for {self.episode}"
 
+    @staticmethod
+    def hash_url(url):
+        """Digest stored in url_hash; callers of bulk_create() must set it themselves."""
+        return hashlib.blake2b(url.encode(), digest_size=16).digest()
+
+    def save(self, *args, **kwargs):
+        self.url_hash = self.hash_url(self.url)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'url' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'url_hash'}
+        super().save(*args, **kwargs)
+
 
 # --- CMS Plugin Models ---
 
+LATEST_MEDIA_LABEL = gettext_noop("Latest %(count)d Media Items")
+FEATURED_MEDIA_LABEL = gettext_noop("Featured Media (%(count)d)")
+
+
+@lru_cache(maxsize=256)
+def _count_label(language, message, count):
+    """Translated plugin label, resolved once per language and count (toolbar/structure mode repeat them)."""
+    with translation.override(language):
+        return gettext(message) % {'count': count}
+
+
 class LatestMediaPluginModel(CMSPlugin):
     """
     Model for the 'Latest Media' CMS plugin.
@@ -239,8 +400,7 @@ class LatestMediaPluginModel(CMSPlugin):
     )
 
     def __str__(self):
-        # Use str() to evaluate the lazy translation
-        return str(_("Latest %(count)d Media Items") % {'count': self.latest_count})
+        return _count_label(translation.get_language(), LATEST_MEDIA_LABEL, self.latest_count)
 
 
 class FeaturedMediaPluginModel(CMSPlugin):
@@ -257,15 +417,22 @@ class FeaturedMediaPluginModel(CMSPlugin):
     )
 
     def __str__(self):
-        # Use str() to evaluate the lazy translation
         if self.title:
             return self.title
-        count = self.items.count() if self.pk else 0  # Check if saved
-        return str(_("Featured Media (%(count)d)") % {'count': count})
+        return _count_label(translation.get_language(), FEATURED_MEDIA_LABEL, self.items_count)
+
+    @property
+    def items_count(self):
+        """Number of featured items, counted once per instance (or set by whoever already loaded them)."""
+        count = getattr(self, '_items_count', None)
+        if count is None:
+            count = self._items_count = self.items.count() if self.pk else 0  # Check if saved
+        return count
 
     def copy_relations(self, oldinstance):
         """Ensure M2M relations are copied when plugin is copied."""
         self.items.set(oldinstance.items.all())
+        self._items_count = None
 
 
 class MediaListByCriteriaPluginModel(CMSPlugin):
@@ -317,10 +484,18 @@ class MediaListByCriteriaPluginModel(CMSPlugin):
         self.countries.set(oldinstance.countries.all())
 
 
+class ViewingHistoryManager(models.Manager):
+    def get_queryset(self):
+        """Joins everything __str__ reads, so listing history entries doesn't query per row."""
+        return super().get_queryset().select_related(
+            'user', 'link__translation', 'link__media_item', 'link__episode__season__media_item'
+        )
+
+
 class ViewingHistory(models.Model):
     """
     Tracks which episode/translation a user has watched and when.
-    Uses update_or_create logic on (user, episode, link) to store the latest watch time.
+    Upserted on (user, link) to store the latest watch time.
     """
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -341,22 +516,45 @@ class ViewingHistory(models.Model):
         verbose_name=_("Episode"),
         null=True, blank=True
     )
+    # Copied from the link on save, so per-item history queries don't join link -> episode -> season.
+    media_item = models.ForeignKey(
+        MediaItem,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name=_("Media Item"),
+        null=True, blank=True, editable=False
+    )
     watched_at = models.DateTimeField(
         _("Watched At"),
         auto_now=True,
         db_index=True
     )
 
+    objects = ViewingHistoryManager()
+
     class Meta:
         verbose_name = _("Viewing History Entry")
         verbose_name_plural = _("Viewing History")
-        unique_together = ('user', 'link')
         ordering = ['-watched_at']
+        constraints = [
+            # Conflict target for the watch-tracking upsert.
+            models.UniqueConstraint(fields=['user', 'link'], name='vh_user_link_uniq'),
+        ]
+        indexes = [
+            # Continue Watching: latest watch per item for one user.
+            models.Index(fields=['user', 'media_item', '-watched_at'], name='vh_user_item_watched_idx'),
+        ]
 
     def __str__(self):
         episode_str = f" - Ep {self.link.episode.episode_number}" if self.link.episode else " (Main Item)"
         translation_str = f" ({self.link.translation.title})" if self.link.translation else ""
-        return f"{self.user.username} watched {self.link.episode.season.media_item.title}{episode_str}{translation_str} at {self.watched_at.strftime('%Y-%m-%d %H:%M')}"
+        media_item = self.link.episode.season.media_item if self.link.episode else self.link.media_item
+        return f"{self.user.username} watched {media_item.title}{episode_str}{translation_str} at {self.watched_at.strftime('%Y-%m-%d %H:%M')}"
+
+    def save(self, *args, **kwargs):
+        # Recomputed every time, so re-pointing an entry at another link can't leave a stale item behind.
+        self.media_item_id = self.link.target_media_item_id
+        super().save(*args, **kwargs)
 
     def clean(self):
         """Ensure episode field matches the episode in the link, if link has one."""
@@ -1,86 +1,298 @@
 # catalog/services/kodik_client.py
+import asyncio
+import hashlib
+import importlib.util
+import json
 import logging
-from typing import Optional, Dict, Any
-from urllib.parse import urljoin
+import random
+import time
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import urljoin, urlsplit, parse_qsl
 
 import httpx
 from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# httpx only negotiates HTTP/2 when h2 is installed; it imports the package itself.
+HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
 
 logger = logging.getLogger(__name__)
 
 
+def _parse_json(response: httpx.Response) -> Any:
+    """Decodes a response body straight from bytes, with orjson when it is installed; None if it is empty."""
+    if not response.content:
+        return None
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return json.loads(response.content)
+
+
 class KodikApiClient:
     DEFAULT_LIMIT = 50
+    MAX_CONNECTIONS = 50
+    # Retries of failed connection attempts only (refused/reset before a response), not of HTTP errors.
+    CONNECT_RETRIES = 1
+    # Whole-request retries for transient failures: these statuses, timeouts and dropped connections.
+    RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+    MAX_RETRIES = 3
+    RETRY_BACKOFF = 0.5  # Seconds; the cap doubles per attempt and the wait is drawn from [0, cap]
+    RETRY_BACKOFF_MAX = 10.0
+    # After this many requests in a row failed transiently, skip requests for BREAKER_COOLDOWN seconds.
+    BREAKER_THRESHOLD = 5
+    BREAKER_COOLDOWN = 30.0
 
     def __init__(self, base_url: str = settings.KODIK_API_BASE_URL, token: str = settings.KODIK_API_TOKEN,
-                 timeout: int = 30):
+                 timeout: int = 30, cache_ttl: int = 0):
         if not base_url or not token:
             raise ValueError("Kodik API base URL and token must be configured in settings.")
         self.base_url = base_url
         self.token = token
         self.timeout = timeout
+        # Seconds to keep /list, /search and translations responses in the Django cache; 0 disables caching.
+        self.cache_ttl = cache_ttl
+        self._session: Optional[httpx.Client] = None
+        self._consecutive_failures = 0
+        self._breaker_open_until = 0.0
+
+    @property
+    def session(self) -> httpx.Client:
+        """Long-lived keep-alive client, so paging loops reuse one TCP/TLS connection."""
+        if self._session is None:
+            limits = httpx.Limits(max_connections=self.MAX_CONNECTIONS,
+                                  max_keepalive_connections=self.MAX_CONNECTIONS)
+            transport = httpx.HTTPTransport(retries=self.CONNECT_RETRIES, limits=limits, http2=HTTP2_AVAILABLE)
+            self._session = httpx.Client(base_url=self.base_url, timeout=self.timeout, transport=transport)
+        return self._session
+
+    def close(self):
+        """Closes the pooled connections; the next request opens a new session."""
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _breaker_is_open(self, url: str) -> bool:
+        """
+        True while the circuit breaker is open. After the cooldown one request is let through as a probe;
+        the breaker stays open for every other caller (concurrent async searches included) until the
+        probe succeeds, or for another cooldown if it does not.
+        """
+        if self._consecutive_failures < self.BREAKER_THRESHOLD:
+            return False
+        now = time.monotonic()
+        if now < self._breaker_open_until:
+            logger.debug(f"Kodik API circuit breaker is open, skipping request to {url}.")
+            return True
+        self._breaker_open_until = now + self.BREAKER_COOLDOWN
+        return False
+
+    def _record_transient_failure(self):
+        self._consecutive_failures += 1
+        if self._consecutive_failures >= self.BREAKER_THRESHOLD:
+            self._breaker_open_until = time.monotonic() + self.BREAKER_COOLDOWN
+            logger.warning(f"Kodik API failed {self._consecutive_failures} times in a row; "
+                           f"pausing requests for {self.BREAKER_COOLDOWN:.0f}s.")
+
+    def _retry_delay(self, e: httpx.HTTPError, attempt: int) -> Optional[float]:
+        """
+        Logs a failed attempt and returns how long to wait before retrying it, or None to give up.
+        Only 429/5xx responses and transport errors (timeouts, refused or dropped connections) are retried.
+        """
+        if isinstance(e, httpx.HTTPStatusError):
+            message = (f"Kodik API request failed for {e.request.url!r}: "
+                       f"Status {e.response.status_code} - {e.response.text}")
+            transient = e.response.status_code in self.RETRY_STATUSES
+        else:
+            message = f"Kodik API request error for {e.request.url!r}: {e}"
+            transient = isinstance(e, httpx.TransportError)
+
+        if transient and attempt < self.MAX_RETRIES:
+            retry_after = e.response.headers.get('Retry-After', '') if isinstance(e, httpx.HTTPStatusError) else ''
+            if retry_after.isdigit():
+                delay = min(float(retry_after), self.RETRY_BACKOFF_MAX)
+            else:
+                delay = random.uniform(0, min(self.RETRY_BACKOFF_MAX, self.RETRY_BACKOFF * 2 ** attempt))
+            logger.warning(f"{message} (retrying in {delay:.1f}s)")
+            return delay
+
+        logger.error(message)
+        if transient:
+            self._record_transient_failure()
+        return None
+
+    def _read_response(self, response: httpx.Response) -> Optional[Dict[str, Any]]:
+        """Checks and decodes the response of one attempt; a success resets the circuit breaker."""
+        logger.debug(f"Kodik API request to: {response.url}")
+        response.raise_for_status()
+        response_data = _parse_json(response)
+        self._consecutive_failures = 0
+        return response_data
+
+    def _attempt_failed(self, e: Exception, url: str, attempt: int) -> Optional[float]:
+        """
+        Handles an exception raised by one attempt, shared by the sync and async request loops.
+        Returns how long to wait before retrying, or None to give up.
+        """
+        if isinstance(e, httpx.HTTPError):
+            return self._retry_delay(e, attempt)
+        logger.exception(f"An unexpected error occurred during Kodik API request to {urljoin(self.base_url, url)}: {e}")
+        return None
+
+    def _get_json(self, url: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """GETs a URL (relative to base_url, or absolute) over the pooled session, retrying transient failures."""
+        if self._breaker_is_open(url):
+            return None
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                return self._read_response(self.session.get(url, params=params))
+            except Exception as e:
+                delay = self._attempt_failed(e, url, attempt)
+                if delay is None:
+                    return None
+            time.sleep(delay)
+        return None
 
     def _make_request(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
         if params is None: params = {}
         params['token'] = self.token
-        url = urljoin(self.base_url, endpoint)
-
-        try:
-            with httpx.Client(timeout=self.timeout) as client:
-                response = client.get(url, params=params)
-                logger.debug(f"Making Kodik API request to: {response.url}")
-                response.raise_for_status()
-                return response.json()
-        except httpx.HTTPStatusError as e:
-            logger.error(
-                f"Kodik API request failed for {e.request.url!r}: Status {e.response.status_code} - {e.response.text}")
-        except httpx.RequestError as e:
-            logger.error(f"Kodik API request error for {e.request.url!r}: {e}")
-        except Exception as e:
-            logger.exception(f"An unexpected error occurred during Kodik API request to {url}: {e}")
+        return self._get_json(endpoint, params)
 
-        return None
+    def async_session(self, max_connections: int = MAX_CONNECTIONS) -> httpx.AsyncClient:
+        """Returns an AsyncClient to share between concurrent *_async calls; use as `async with`."""
+        # Over HTTP/2 the concurrent searches share streams on a few connections instead of one each.
+        transport = httpx.AsyncHTTPTransport(retries=self.CONNECT_RETRIES, http2=HTTP2_AVAILABLE,
+                                             limits=httpx.Limits(max_connections=max_connections))
+        return httpx.AsyncClient(base_url=self.base_url, timeout=self.timeout, transport=transport)
 
-    def list_items(self, limit: int = DEFAULT_LIMIT, page_link: Optional[str] = None, **kwargs: Any) -> Optional[
-        Dict[str, Any]]:
-        if page_link:
+    async def _make_request_async(self, session: httpx.AsyncClient, endpoint: str,
+                                  params: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """Async counterpart of _make_request; session must come from async_session() (it carries the base_url)."""
+        if params is None: params = {}
+        params['token'] = self.token
+        if self._breaker_is_open(endpoint):
+            return None
+
+        for attempt in range(self.MAX_RETRIES + 1):
             try:
-                with httpx.Client(timeout=self.timeout) as client:
-                    response = client.get(page_link)
-                    response.raise_for_status()
-                    return response.json()
-            except httpx.HTTPStatusError as e:
-                logger.error(
-                    f"Kodik API request failed for {e.request.url!r}: Status {e.response.status_code} - {e.response.text}")
-            except httpx.RequestError as e:
-                logger.error(f"Kodik API request error for {e.request.url!r}: {e}")
+                # Relative to the session's base_url
+                return self._read_response(await session.get(endpoint, params=params))
             except Exception as e:
-                logger.exception(f"An unexpected error occurred during Kodik API request to {page_link}: {e}")
-            return None
-        else:
-            endpoint = 'list'
-            params = {'limit': min(max(limit, 1), 100)}
-            for key, value in kwargs.items():
-                if value is not None:
-                    if isinstance(value, bool):
-                        params[key] = str(value).lower()
-                    elif isinstance(value, (list, tuple)):
-                        params[key] = ','.join(map(str, value))
-                    else:
-                        params[key] = str(value)
-
-            return self._make_request(endpoint, params=params)
-
-    def get_translations(self, **kwargs: Any) -> Optional[Dict[str, Any]]:
+                delay = self._attempt_failed(e, endpoint, attempt)
+                if delay is None:
+                    return None
+            await asyncio.sleep(delay)
+        return None
+
+    @staticmethod
+    def _serialize_params(filters: Dict[str, Any]) -> Dict[str, str]:
+        """
+        Converts filter values to Kodik's query format: lowercase booleans and comma-joined lists.
+        None and empty values are left out rather than sent as empty filters.
+        """
+        params = {}
+        for key, value in filters.items():
+            if value is None or (isinstance(value, (str, list, tuple)) and not value):
+                continue
+            if isinstance(value, bool):
+                params[key] = 'true' if value else 'false'
+            elif isinstance(value, (list, tuple)):
+                params[key] = ','.join(map(str, value))
+            else:
+                params[key] = str(value)
+        return params
+
+    @staticmethod
+    def _cache_key(endpoint: str, params: Dict[str, Any]) -> str:
+        """Cache key of a query: the endpoint and its parameters in canonical order, without the token."""
+        canonical = json.dumps(sorted((k, v) for k, v in params.items() if k != 'token'), default=str)
+        return f"kodik:{endpoint}:{hashlib.blake2b(canonical.encode(), digest_size=16).hexdigest()}"
+
+    def _cached(self, endpoint: str, key_params: Dict[str, Any],
+                fetch: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Serves fetch() from the Django cache for cache_ttl seconds; failures are not cached."""
+        cache_key = self._cache_key(endpoint, key_params)
+        response_data = cache.get(cache_key)
+        if response_data is None:
+            response_data = fetch()
+            if response_data is not None:
+                cache.set(cache_key, response_data, self.cache_ttl)
+        return response_data
+
+    def list_items(self, limit: int = DEFAULT_LIMIT, page_link: Optional[str] = None, bypass_cache: bool = False,
+                   **kwargs: Any) -> Optional[Dict[str, Any]]:
+        """
+        Fetches one /list page, either from filters or from a 'next_page' link. With cache_ttl set,
+        identical queries are served from the Django cache unless bypass_cache is given.
+        """
+        params = None if page_link else {'limit': min(max(limit, 1), 100), **self._serialize_params(kwargs)}
+
+        if self.cache_ttl and not bypass_cache:
+            if page_link:
+                parts = urlsplit(page_link)
+                key_params = dict(parse_qsl(parts.query))
+                key_params['_page_path'] = parts.path
+            else:
+                key_params = params  # Serialized, so equivalent filter spellings share one entry
+            return self._cached('list', key_params,
+                                lambda: self.list_items(limit, page_link, bypass_cache=True, **kwargs))
+
+        if page_link:
+            return self._get_json(page_link)
+        return self._make_request('list', params=params)
+
+    def get_translations(self, bypass_cache: bool = False, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        """Fetches the translations reference list; cached like list_items when cache_ttl is set."""
         endpoint = 'translations/v2'
+        if self.cache_ttl and not bypass_cache:
+            return self._cached('translations', self._serialize_params(kwargs),
+                                lambda: self._make_request(endpoint, params=kwargs))
         return self._make_request(endpoint, params=kwargs)
 
+    def _build_search_params(self,
+                             kinopoisk_id: Optional[str] = None,
+                             imdb_id: Optional[str] = None,
+                             shikimori_id: Optional[str] = None,
+                             mydramalist_id: Optional[str] = None,
+                             limit: int = 100,
+                             **kwargs: Any) -> Optional[Dict[str, Any]]:
+        """Builds /search query parameters, or returns None if no external ID is given."""
+        params = {
+            'kinopoisk_id': kinopoisk_id,
+            'imdb_id': imdb_id,
+            'shikimori_id': shikimori_id,
+            'mdl_id': mydramalist_id,
+            'limit': min(max(limit, 1), 100)
+        }
+        # Remove None values from ID params
+        params = {k: v for k, v in params.items() if v is not None}
+
+        if not any(params.get(id_field) for id_field in ['kinopoisk_id', 'imdb_id', 'shikimori_id', 'mdl_id']):
+            logger.error("Search by IDs requires at least one external ID (KP, IMDb, Shiki, MDL).")
+            return None
+
+        params.update(self._serialize_params(kwargs))
+        return params
+
     def search_by_ids(self,
                       kinopoisk_id: Optional[str] = None,
                       imdb_id: Optional[str] = None,
                       shikimori_id: Optional[str] = None,
                       mydramalist_id: Optional[str] = None,
                       limit: int = 100,
+                      bypass_cache: bool = False,
                       **kwargs: Any) -> Optional[Dict[str, Any]]:
         """
         Searches for materials using external IDs via the /search endpoint.
@@ -92,34 +304,26 @@ class KodikApiClient:
             shikimori_id: Shikimori ID.
             mydramalist_id: MyDramaList ID (mdl_id in API).
             limit: Max number of results (translations) to return.
+            bypass_cache: Skip the response cache (only used when cache_ttl is set).
             **kwargs: Additional filter parameters for /search (e.g., with_material_data, with_episodes_data).
 
         Returns:
             The parsed JSON response dictionary from the API, or None on failure.
             Expected keys: 'time', 'total', 'results' (list of dicts, each representing a translation variant).
         """
-        endpoint = 'search'
-        params = {
-            'kinopoisk_id': kinopoisk_id,
-            'imdb_id': imdb_id,
-            'shikimori_id': shikimori_id,
-            'mdl_id': mydramalist_id,
-            'limit': min(max(limit, 1), 100)
-        }
-        # Remove None values from ID params
-        params = {k: v for k, v in params.items() if v is not None}
-
-        if not any(params.get(id_field) for id_field in ['kinopoisk_id', 'imdb_id', 'shikimori_id', 'mdl_id']):
-            logger.error("Search by IDs requires at least one external ID (KP, IMDb, Shiki, MDL).")
+        params = self._build_search_params(kinopoisk_id, imdb_id, shikimori_id, mydramalist_id, limit, **kwargs)
+        if params is None:
             return None
+        if self.cache_ttl and not bypass_cache:
+            return self._cached('search', params, lambda: self._make_request('search', params=params))
+        return self._make_request('search', params=params)
 
-        for key, value in kwargs.items():
-            if value is not None:
-                if isinstance(value, bool):
-                    params[key] = str(value).lower()
-                elif isinstance(value, (list, tuple)):
-                    params[key] = ','.join(map(str, value))
-                else:
-                    params[key] = str(value)
-
-        return self._make_request(endpoint, params=params)
+    async def search_by_ids_async(self, session: httpx.AsyncClient, **kwargs: Any) -> Optional[Dict[str, Any]]:
+        """
+        Async variant of search_by_ids, meant to be awaited concurrently for many items
+        over one shared session (see async_session). Accepts the same arguments.
+        """
+        params = self._build_search_params(**kwargs)
+        if params is None:
+            return None
+        return await self._make_request_async(session, 'search', params=params)
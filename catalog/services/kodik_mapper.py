@@ -20,51 +20,48 @@ def _parse_translation(translation_data: Optional[Dict[str, Any]]) -> Tuple[Opti
     return None, str(translation_data.get('id'))
 
 
-def _get_string_list(data: Optional[Dict[str, Any]], key: str) -> List[str]:
-    """ Safely gets a list of strings from material_data """
-    if not data or not isinstance(data, dict):
-        return []
+def _get_string_list(data: Dict[str, Any], key: str) -> List[str]:
+    """ Gets a list of strings from material_data (the caller has checked it is a dict) """
     value = data.get(key)
     if isinstance(value, list):
         return [str(item).strip() for item in value if item]
     return []
 
 
-def _get_safe_string(data: Optional[Dict[str, Any]], key: str) -> Optional[str]:
-    """ Safely gets a string value from a dictionary """
-    if not data or not isinstance(data, dict):
-        return None
+def _get_safe_string(data: Dict[str, Any], key: str) -> Optional[str]:
+    """ Gets a string value from material_data (the caller has checked it is a dict) """
     value = data.get(key)
     return str(value) if value is not None else None
 
 
+# Mapping based on Kodik documentation examples; built once at import instead of per item
+_KODIK_TYPE_MAP = {
+    'foreign-movie': MediaItem.MediaType.MOVIE,
+    'russian-movie': MediaItem.MediaType.MOVIE,
+    'soviet-cartoon': MediaItem.MediaType.CARTOON_MOVIE,  # Or SERIES if applicable? Assuming movie
+    'foreign-cartoon': MediaItem.MediaType.CARTOON_MOVIE,
+    'russian-cartoon': MediaItem.MediaType.CARTOON_MOVIE,
+    'anime': MediaItem.MediaType.ANIME_MOVIE,  # Defaulting 'anime' type to movie, serial handled below
+    'cartoon-serial': MediaItem.MediaType.CARTOON_SERIES,
+    'documentary-serial': MediaItem.MediaType.DOCUMENTARY_SERIES,
+    'russian-serial': MediaItem.MediaType.TV_SHOW,
+    'foreign-serial': MediaItem.MediaType.TV_SHOW,
+    'anime-serial': MediaItem.MediaType.ANIME_SERIES,
+    'multi-part-film': MediaItem.MediaType.TV_SHOW,  # Or a specific type if needed?
+    # Add mappings for other potential types if discovered
+}
+_EMPTY_TO_NONE_KEYS = ('original_title', 'kinopoisk_id', 'imdb_id', 'shikimori_id', 'mydramalist_id')
+
+
 def _map_kodik_type_to_model_type(kodik_type: Optional[str]) -> str:
     """ Maps Kodik's type string to generic MediaItem.MediaType enum value. """
     if not kodik_type:
         return MediaItem.MediaType.UNKNOWN
 
-    # Mapping based on Kodik documentation examples
-    type_map = {
-        'foreign-movie': MediaItem.MediaType.MOVIE,
-        'russian-movie': MediaItem.MediaType.MOVIE,
-        'soviet-cartoon': MediaItem.MediaType.CARTOON_MOVIE,  # Or SERIES if applicable? Assuming movie
-        'foreign-cartoon': MediaItem.MediaType.CARTOON_MOVIE,
-        'russian-cartoon': MediaItem.MediaType.CARTOON_MOVIE,
-        'anime': MediaItem.MediaType.ANIME_MOVIE,  # Defaulting 'anime' type to movie, serial handled below
-        'cartoon-serial': MediaItem.MediaType.CARTOON_SERIES,
-        'documentary-serial': MediaItem.MediaType.DOCUMENTARY_SERIES,
-        'russian-serial': MediaItem.MediaType.TV_SHOW,
-        'foreign-serial': MediaItem.MediaType.TV_SHOW,
-        'anime-serial': MediaItem.MediaType.ANIME_SERIES,
-        'multi-part-film': MediaItem.MediaType.TV_SHOW,  # Or a specific type if needed?
-        # Add mappings for other potential types if discovered
-    }
-
-    generic_type = type_map.get(kodik_type, MediaItem.MediaType.UNKNOWN)
-
-    if generic_type == MediaItem.MediaType.UNKNOWN:
+    generic_type = _KODIK_TYPE_MAP.get(kodik_type)
+    if generic_type is None:
         logger.warning(f"Unknown Kodik type encountered: {kodik_type}. Falling back to UNKNOWN.")
-
+        return MediaItem.MediaType.UNKNOWN
     return generic_type
 
 
@@ -99,7 +96,7 @@ def map_kodik_item_to_models(item_data: Dict[str, Any]) -> Optional[Dict[str, An
         logger.warning(f"Skipping item {source_specific_id}: Missing title.")
         return None
 
-    for key in ['original_title', 'kinopoisk_id', 'imdb_id', 'shikimori_id', 'mydramalist_id']:
+    for key in _EMPTY_TO_NONE_KEYS:
         if media_item_map[key] == '':
             media_item_map[key] = None
 
@@ -108,19 +105,19 @@ def map_kodik_item_to_models(item_data: Dict[str, Any]) -> Optional[Dict[str, An
     countries: Set[str] = set()
 
     if material_data and isinstance(material_data, dict):
-        media_item_map['description'] = _get_safe_string(material_data, 'description') or _get_safe_string(
-            material_data, 'anime_description')
-        media_item_map['poster_url'] = _get_safe_string(material_data, 'poster_url') or _get_safe_string(material_data,
-                                                                                                         'anime_poster_url') or _get_safe_string(
-            material_data, 'drama_poster_url')
-
-        media_item_map['kinopoisk_id'] = _get_safe_string(material_data, 'kinopoisk_id') or media_item_map[
-            'kinopoisk_id']
+        media_item_map['description'] = (_get_safe_string(material_data, 'description')
+                                         or _get_safe_string(material_data, 'anime_description'))
+        media_item_map['poster_url'] = (_get_safe_string(material_data, 'poster_url')
+                                        or _get_safe_string(material_data, 'anime_poster_url')
+                                        or _get_safe_string(material_data, 'drama_poster_url'))
+
+        media_item_map['kinopoisk_id'] = (_get_safe_string(material_data, 'kinopoisk_id')
+                                          or media_item_map['kinopoisk_id'])
         media_item_map['imdb_id'] = _get_safe_string(material_data, 'imdb_id') or media_item_map['imdb_id']
-        media_item_map['shikimori_id'] = _get_safe_string(material_data, 'shikimori_id') or media_item_map[
-            'shikimori_id']
-        media_item_map['mydramalist_id'] = _get_safe_string(material_data, 'mydramalist_id') or media_item_map[
-            'mydramalist_id']
+        media_item_map['shikimori_id'] = (_get_safe_string(material_data, 'shikimori_id')
+                                          or media_item_map['shikimori_id'])
+        media_item_map['mydramalist_id'] = (_get_safe_string(material_data, 'mydramalist_id')
+                                            or media_item_map['mydramalist_id'])
 
         genres.update(_get_string_list(material_data, 'genres'))
         genres.update(_get_string_list(material_data, 'anime_genres'))
@@ -129,7 +126,7 @@ def map_kodik_item_to_models(item_data: Dict[str, Any]) -> Optional[Dict[str, An
         countries.update(_get_string_list(material_data, 'countries'))
 
     mapped_data['media_item_data'] = {k: v for k, v in media_item_map.items() if v is not None}
-    mapped_data['genres'] = sorted(list(genres))
-    mapped_data['countries'] = sorted(list(countries))
+    mapped_data['genres'] = sorted(genres)
+    mapped_data['countries'] = sorted(countries)
 
     return mapped_data
@@ -31,6 +31,8 @@ class MediaItemProcessor:
         self.verbosity = verbosity
         # Define ID fields once
         self.id_fields = ['kinopoisk_id', 'imdb_id', 'shikimori_id', 'mydramalist_id']
+        # Genres/countries by lower-cased name, loaded once per run; these tables hold a few dozen rows.
+        self._m2m_by_name: Dict[type, Dict[str, Any]] = {}
 
     def _log(self, message, level=logging.INFO, log_verbosity=2):
         """Logs messages if command verbosity allows."""
@@ -76,7 +78,8 @@ class MediaItemProcessor:
         for field, api_value in api_non_empty_ids.items():
             candidate_query &= ~Q(**{f"{field}__isnull": False}) | Q(**{field: api_value})
 
-        candidates = MediaItem.objects.filter(candidate_query)
+        # Equal-priority candidates are decided by iteration order: the most recently updated one wins.
+        candidates = MediaItem.objects.filter(candidate_query).order_by('-updated_at', 'title')
         if not candidates.exists():
             self._log(f"    _find_subset_match: No candidates found after initial filter.", log_verbosity=3)
             return None
@@ -124,46 +127,72 @@ class MediaItemProcessor:
             self._log(f"    _find_subset_match: No suitable subset match found.", log_verbosity=3)
         return best_match
 
+    @staticmethod
+    def _find_by_names(model_class, names) -> Dict[str, Any]:
+        """Looks up Genre/Country rows case-insensitively, keyed by lower-cased name."""
+        names_query = Q()
+        for name in names:
+            names_query |= Q(name__iexact=name)
+        return {obj.name.lower(): obj for obj in model_class.objects.filter(names_query)}
+
     def _get_or_create_m2m(self, model_class, names: List[str]) -> Set:
-        """Gets or creates M2M related objects."""
+        """Gets or creates M2M related objects; names missing from the map are created in one bulk insert."""
         target_objects = set()
         valid_names = [name.strip() for name in names if name.strip()]
         if not valid_names:
             return target_objects
 
-        # Bulk get existing
-        existing_qs = model_class.objects.filter(name__in=valid_names)
-        existing_map = {obj.name.lower(): obj for obj in existing_qs}
-        target_objects.update(existing_map.values())
+        existing_map = self._m2m_by_name.get(model_class)
+        if existing_map is None:
+            existing_map = self._m2m_by_name[model_class] = {
+                obj.name.lower(): obj for obj in model_class.objects.all()
+            }
 
-        # Create missing
+        missing = {}
         for name in valid_names:
-            if name.lower() not in existing_map:
-                # Use get_or_create for race-condition safety within the loop
-                obj, created = model_class.objects.get_or_create(
-                    name__iexact=name, defaults={'name': name}
-                )
+            obj = existing_map.get(name.lower())
+            if obj is None:
+                missing.setdefault(name.lower(), name)
+            else:
                 target_objects.add(obj)
-                if created:
-                    self._log(f"      Created new {model_class.__name__}: {name}", log_verbosity=3)
+
+        if missing:
+            found = self._find_by_names(model_class, missing.values())
+            new_names = [name for key, name in missing.items() if key not in found]
+            if new_names:
+                # Conflicts mean a concurrent run inserted the name first; the re-read picks its row up.
+                model_class.objects.bulk_create([model_class(name=name) for name in new_names],
+                                                ignore_conflicts=True)
+                found.update(self._find_by_names(model_class, new_names))
+                self._log(f"      Created new {model_class.__name__}: {', '.join(new_names)}", log_verbosity=3)
+            target_objects.update(found.values())
+            # Mapped once the item's transaction commits; a rolled-back item drops the callback with its rows.
+            transaction.on_commit(lambda: existing_map.update(found))
         return target_objects
 
-    def _update_m2m_relations(self, media_item: MediaItem, genre_names: List[str], country_names: List[str]) -> bool:
+    def _update_m2m_relations(self, media_item: MediaItem, genre_names: List[str], country_names: List[str],
+                              is_new: bool = False) -> bool:
         """Updates M2M relations (genres, countries) and returns True if changed."""
         m2m_changed = False
 
-        # Genres
-        current_genres = set(media_item.genres.all())
+        # Genres (a new item has none yet, so there is nothing to read or replace)
+        current_genres = set() if is_new else set(media_item.genres.all())
         target_genres = self._get_or_create_m2m(Genre, genre_names)
         if current_genres != target_genres:
-            media_item.genres.set(list(target_genres))
+            if is_new:
+                media_item.genres.add(*target_genres)
+            else:
+                media_item.genres.set(list(target_genres))
             m2m_changed = True
 
         # Countries
-        current_countries = set(media_item.countries.all())
+        current_countries = set() if is_new else set(media_item.countries.all())
         target_countries = self._get_or_create_m2m(Country, country_names)
         if current_countries != target_countries:
-            media_item.countries.set(list(target_countries))
+            if is_new:
+                media_item.countries.add(*target_countries)
+            else:
+                media_item.countries.set(list(target_countries))
             m2m_changed = True
 
         if m2m_changed:
@@ -173,34 +202,24 @@ class MediaItemProcessor:
 
         return m2m_changed
 
-    def _update_metadata(self, media_item: MediaItem, api_updated_at: datetime, meta_created: bool) -> None:
-        """Creates or updates the MediaItemSourceMetadata record."""
-        try:
-            metadata, created = MediaItemSourceMetadata.objects.get_or_create(
-                media_item=media_item,
-                source=self.kodik_source,
-                defaults={'source_last_updated_at': api_updated_at}
-            )
-            # Always update if API time is different, or if meta was just created via outer scope
-            if not created and (metadata.source_last_updated_at != api_updated_at or meta_created):
-                metadata.source_last_updated_at = api_updated_at
-                metadata.save(update_fields=['source_last_updated_at'])
-                self._log(f"      Updated metadata timestamp for MediaItem {media_item.pk}", log_verbosity=3)
-            elif created:  # Already set via defaults
-                self._log(f"      Created metadata timestamp for MediaItem {media_item.pk}", log_verbosity=3)
-
-        except Exception as e:
-            logger.error(f"Failed to update metadata timestamp for MediaItem {media_item.pk}: {e}")
-            # Non-critical error, processing can continue
+    def _update_metadata(self, media_item: MediaItem, api_updated_at: datetime) -> None:
+        """Upserts the item's MediaItemSourceMetadata timestamp in one statement."""
+        MediaItemSourceMetadata.objects.bulk_create(
+            [MediaItemSourceMetadata(media_item=media_item, source=self.kodik_source,
+                                     source_last_updated_at=api_updated_at)],
+            update_conflicts=True, unique_fields=['media_item', 'source'], update_fields=['source_last_updated_at']
+        )
+        self._log(f"      Saved metadata timestamp for MediaItem {media_item.pk}", log_verbosity=3)
 
     def _update_item(self, media_item: MediaItem, media_item_data: Dict[str, Any], api_ids: Dict[str, Optional[str]],
                      genre_names: List[str], country_names: List[str], api_updated_at: datetime,
                      is_subset_match: bool) -> str:
         """Handles the logic for updating an existing MediaItem."""
         action = 'skipped'  # Default if no changes needed
-        metadata, meta_created = MediaItemSourceMetadata.objects.get_or_create(
+        # None both when the metadata row is missing and when it has no timestamp yet; either forces an update.
+        known_updated_at = MediaItemSourceMetadata.objects.filter(
             media_item=media_item, source=self.kodik_source
-        )
+        ).values_list('source_last_updated_at', flat=True).first()
         should_update_main_data = False
         fields_to_update = {}
 
@@ -217,7 +236,7 @@ class MediaItemProcessor:
             defaults_for_update = media_item_data.copy()
             for key in api_ids.keys(): defaults_for_update.pop(key, None)  # Exclude IDs from default update
 
-            if meta_created or metadata.source_last_updated_at is None or api_updated_at > metadata.source_last_updated_at:
+            if known_updated_at is None or api_updated_at > known_updated_at:
                 should_update_main_data = True
                 fields_to_update = defaults_for_update
                 self._log(f"    API data is newer or metadata created for MediaItem {media_item.pk}.", log_verbosity=3)
@@ -238,30 +257,22 @@ class MediaItemProcessor:
             for field, value in fields_to_update.items():
                 setattr(media_item, field, value)
 
-            try:
-                if 'updated_at' in update_fields_list: update_fields_list.remove('updated_at')
-                if update_fields_list:
-                    media_item.save(update_fields=update_fields_list)
-                    action = 'updated'
-                    self._log(f"      Updated fields: {', '.join(update_fields_list)}", log_verbosity=3)
-            except Exception as e:
-                logger.exception(f"Error saving updated fields for existing MediaItem {media_item.pk}: {e}")
-                raise MediaItemProcessorError(f"Error saving fields for MediaItem {media_item.pk}")
+            if 'updated_at' in update_fields_list: update_fields_list.remove('updated_at')
+            if update_fields_list:
+                media_item.save(update_fields=update_fields_list)
+                action = 'updated'
+                self._log(f"      Updated fields: {', '.join(update_fields_list)}", log_verbosity=3)
 
             # Update M2M if needed
             m2m_changed = False
             if should_update_main_data:
-                try:
-                    m2m_changed = self._update_m2m_relations(media_item, genre_names, country_names)
-                    if m2m_changed:
-                        action = 'updated'  # Ensure status reflects M2M change
-                except Exception as e:
-                    logger.error(f"Error updating M2M for MediaItem {media_item.pk} during update: {e}")
-                    # Optionally raise, but currently just logs
+                m2m_changed = self._update_m2m_relations(media_item, genre_names, country_names)
+                if m2m_changed:
+                    action = 'updated'  # Ensure status reflects M2M change
 
             # Update metadata timestamp
             if should_update_main_data:
-                self._update_metadata(media_item, api_updated_at, meta_created)
+                self._update_metadata(media_item, api_updated_at)
 
             # If only metadata timestamp changed, action should still be 'skipped' or 'updated' if M2M changed
             if action == 'skipped' and m2m_changed:
@@ -281,27 +292,18 @@ class MediaItemProcessor:
                      api_updated_at: datetime) -> Tuple[MediaItem, str]:
         """Creates a new MediaItem and its relations."""
         self._log(f"  Creating new MediaItem ('{media_item_data.get('title')}')", log_verbosity=2)
-        try:
-            media_item = MediaItem.objects.create(**media_item_data)
-
-            # Add M2M relations
-            self._update_m2m_relations(media_item, genre_names, country_names)
+        media_item = MediaItem.objects.create(**media_item_data)
 
-            # Create metadata record
-            self._update_metadata(media_item, api_updated_at, True)  # meta_created is True
+        # Add M2M relations
+        self._update_m2m_relations(media_item, genre_names, country_names, is_new=True)
 
-            self._log(f"    Successfully created MediaItem PK {media_item.pk}", log_verbosity=3)
-            return media_item, 'created'
+        # Create metadata record
+        self._update_metadata(media_item, api_updated_at)
 
-        except IntegrityError as e:
-            logger.error(f"Integrity error creating MediaItem with data {media_item_data}: {e}")
-            raise MediaItemProcessorError("Integrity error during creation")
-        except Exception as e:
-            logger.exception(f"Unexpected error creating MediaItem with data {media_item_data}: {e}")
-            raise MediaItemProcessorError("Unexpected error during creation")
+        self._log(f"    Successfully created MediaItem PK {media_item.pk}", log_verbosity=3)
+        return media_item, 'created'
 
     # --- Main Processing Method ---
-    @transaction.atomic  # Ensure atomicity for find/create/update logic
     def process_api_item(self, mapped_data: Dict[str, Any], api_updated_at: datetime) -> Tuple[
         Optional[MediaItem], str]:
         """
@@ -327,31 +329,37 @@ class MediaItemProcessor:
             logger.warning(f"Skipping item ('{media_item_data['title']}'): No external IDs provided by API.")
             return None, 'skipped_no_ids'  # Add kodik_internal_id logic here later
 
+        # Errors propagate out of the atomic block so the whole find/create/update is rolled back,
+        # then get logged once here.
         try:
-            # 1. Try exact match
-            media_item = self._find_exact_match(api_ids)
-            if media_item:
-                self._log(f"  Found exact match -> MediaItem PK {media_item.pk}", log_verbosity=2)
-                action = self._update_item(media_item, media_item_data, api_ids, genre_names, country_names,
-                                           api_updated_at, is_subset_match=False)
+            with transaction.atomic():
+                # 1. Try exact match
+                media_item = self._find_exact_match(api_ids)
+                if media_item:
+                    self._log(f"  Found exact match -> MediaItem PK {media_item.pk}", log_verbosity=2)
+                    action = self._update_item(media_item, media_item_data, api_ids, genre_names, country_names,
+                                               api_updated_at, is_subset_match=False)
+                    return media_item, action
+
+                # 2. Try subset match
+                media_item = self._find_subset_match(api_non_empty_ids)
+                if media_item:
+                    self._log(f"  Found subset match -> MediaItem PK {media_item.pk}", log_verbosity=2)
+                    action = self._update_item(media_item, media_item_data, api_ids, genre_names, country_names,
+                                               api_updated_at, is_subset_match=True)
+                    return media_item, action
+
+                # 3. Create new item
+                self._log(f"  No existing match found. Creating new item.", log_verbosity=3)
+                media_item, action = self._create_item(media_item_data, genre_names, country_names, api_updated_at)
                 return media_item, action
 
-            # 2. Try subset match
-            media_item = self._find_subset_match(api_non_empty_ids)
-            if media_item:
-                self._log(f"  Found subset match -> MediaItem PK {media_item.pk}", log_verbosity=2)
-                action = self._update_item(media_item, media_item_data, api_ids, genre_names, country_names,
-                                           api_updated_at, is_subset_match=True)
-                return media_item, action
-
-            # 3. Create new item
-            self._log(f"  No existing match found. Creating new item.", log_verbosity=3)
-            media_item, action = self._create_item(media_item_data, genre_names, country_names, api_updated_at)
-            return media_item, action
-
         except MediaItemProcessorError as e:
             logger.error(f"Processor error for item with API IDs {api_ids}: {e}")
             return None, f'error_{type(e).__name__}'  # e.g., error_MediaItemProcessorError
+        except IntegrityError as e:
+            logger.error(f"Integrity error processing item with API IDs {api_ids}: {e}")
+            return None, 'error_integrity'
         except Exception as e:
             logger.exception(f"Unexpected outer error processing item with API IDs {api_ids}: {e}")
             return None, 'error_outer_processor'
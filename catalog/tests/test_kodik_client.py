@@ -0,0 +1,107 @@
+# catalog/tests/test_kodik_client.py
+
+import time
+from unittest import mock
+
+import httpx
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from catalog.services.kodik_client import KodikApiClient
+
+
+class KodikApiClientCacheTests(SimpleTestCase):
+    """Tests for the optional response cache of KodikApiClient."""
+
+    def setUp(self):
+        cache.clear()
+        self.requests = []
+
+        def handler(request):
+            self.requests.append(request)
+            return httpx.Response(200, json={'results': [], 'total': 0})
+
+        self.client = KodikApiClient(base_url='https://kodik.test/', token='secret', cache_ttl=60)
+        self.client._session = httpx.Client(base_url=self.client.base_url, transport=httpx.MockTransport(handler))
+        self.addCleanup(self.client.close)
+
+    def test_identical_queries_hit_the_api_once(self):
+        """Test that repeated /list queries with equivalent filters are served from the cache."""
+        self.client.list_items(limit=10, types='anime', year=2020)
+        self.client.list_items(year='2020', types=['anime'], limit=10, genres=None, countries='')
+        self.assertEqual(len(self.requests), 1)
+        self.assertNotIn('secret', KodikApiClient._cache_key('list', {'limit': 10, 'token': 'secret'}))
+
+    def test_bypass_cache_and_page_links(self):
+        """Test that bypass_cache forces a request and that next_page links are cached by their query."""
+        self.client.list_items(limit=10)
+        self.client.list_items(limit=10, bypass_cache=True)
+        page_link = 'https://kodik.test/list?token=secret&next=abc'
+        self.client.list_items(page_link=page_link)
+        self.client.list_items(page_link=page_link)
+        self.assertEqual(len(self.requests), 3)
+
+    def test_search_and_translations_are_cached_per_endpoint(self):
+        """Test that /search is cached per ID set and that the translations list has its own entry."""
+        self.client.search_by_ids(shikimori_id='100', with_episodes_data=True)
+        self.client.search_by_ids(shikimori_id='100', with_episodes_data=True)
+        self.client.search_by_ids(shikimori_id='200', with_episodes_data=True)
+        self.client.get_translations()
+        self.client.get_translations()
+        self.assertEqual([request.url.path for request in self.requests],
+                         ['/search', '/search', '/translations/v2'])
+
+
+class KodikApiClientRetryTests(SimpleTestCase):
+    """Tests for the transient-failure retries and the circuit breaker of KodikApiClient."""
+
+    def setUp(self):
+        self.statuses = []
+        self.requests = []
+
+        def handler(request):
+            self.requests.append(request)
+            status = self.statuses.pop(0) if self.statuses else 200
+            return httpx.Response(status, json={'results': []})
+
+        self.client = KodikApiClient(base_url='https://kodik.test/', token='secret')
+        self.client._session = httpx.Client(base_url=self.client.base_url, transport=httpx.MockTransport(handler))
+        self.addCleanup(self.client.close)
+        sleep_patcher = mock.patch('catalog.services.kodik_client.time.sleep')
+        self.sleep = sleep_patcher.start()
+        self.addCleanup(sleep_patcher.stop)
+
+    def test_transient_status_is_retried(self):
+        """Test that 503 responses are retried with backoff and that client errors are not."""
+        self.statuses = [503, 503]
+        self.assertEqual(self.client.get_translations(), {'results': []})
+        self.assertEqual(len(self.requests), 3)
+        self.assertEqual(self.sleep.call_count, 2)
+
+        self.statuses = [404]
+        self.assertIsNone(self.client.get_translations())
+        self.assertEqual(len(self.requests), 4)
+
+    def test_breaker_opens_after_repeated_failures(self):
+        """Test that after BREAKER_THRESHOLD exhausted requests no further requests are sent."""
+        self.client.MAX_RETRIES = 0
+        self.statuses = [503] * self.client.BREAKER_THRESHOLD
+        for _ in range(self.client.BREAKER_THRESHOLD):
+            self.assertIsNone(self.client.get_translations())
+        self.assertIsNone(self.client.get_translations())
+        self.assertEqual(len(self.requests), self.client.BREAKER_THRESHOLD)
+
+    def test_breaker_lets_one_probe_through_after_cooldown(self):
+        """Test that after the cooldown only one request probes the API and that its success closes the breaker."""
+        self.client._consecutive_failures = self.client.BREAKER_THRESHOLD
+        self.client._breaker_open_until = time.monotonic() + self.client.BREAKER_COOLDOWN
+        self.assertTrue(self.client._breaker_is_open('list'))
+
+        self.client._breaker_open_until = 0.0
+        self.assertFalse(self.client._breaker_is_open('list'))
+        self.assertTrue(self.client._breaker_is_open('list'))
+
+        self.client._breaker_open_until = 0.0
+        self.assertEqual(self.client.get_translations(), {'results': []})
+        self.assertEqual(self.client.get_translations(), {'results': []})
+        self.assertEqual(len(self.requests), 2)
@@ -76,6 +76,25 @@ class MediaItemProcessorTests(TestCase):
         meta = MediaItemSourceMetadata.objects.get(media_item=item, source=self.source_kodik)
         self.assertEqual(meta.source_last_updated_at, self.now)
 
+    def test_create_item_with_new_genres(self):
+        """Test that unknown genre names are created once each, matching known names case-insensitively."""
+        api_data = dict(self.base_api_item_data, genres=['action', 'Drama', 'drama ', 'Thriller'])
+        item, status = self.processor.process_api_item(api_data, self.now)
+
+        self.assertEqual(status, 'created')
+        self.assertEqual(Genre.objects.count(), 4)
+        self.assertEqual(set(item.genres.values_list('name', flat=True)), {'Action', 'Drama', 'Thriller'})
+
+    def test_created_genres_are_reused_by_later_items(self):
+        """Test that names created for one item are served from the per-run map for the next one."""
+        with self.captureOnCommitCallbacks(execute=True):
+            self.processor.process_api_item(dict(self.base_api_item_data, genres=['Thriller']), self.now)
+
+        self.assertIn('thriller', self.processor._m2m_by_name[Genre])
+        with self.assertNumQueries(0):
+            genres = self.processor._get_or_create_m2m(Genre, ['THRILLER', 'action'])
+        self.assertEqual({genre.name for genre in genres}, {'Thriller', 'Action'})
+
     def test_exact_match_no_update_needed(self):
         """Test finding an exact match but skipping update (API data not newer)."""
         # 1. Create initial item
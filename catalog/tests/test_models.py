@@ -0,0 +1,161 @@
+# catalog/tests/test_models.py
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+from django.test import SimpleTestCase, TestCase
+
+from catalog.models import (
+    MediaItem, Season, Episode, Genre, MediaSourceLink, Source, Translation, ViewingHistory
+)
+
+
+class DisplayQuerySetTests(TestCase):
+    """Tests for the with_display() projections used by admin list pages."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.item = MediaItem.objects.create(title='Show', release_year=2020, description='Long text',
+                                            media_type=MediaItem.MediaType.TV_SHOW)
+        cls.season = Season.objects.create(media_item=cls.item, season_number=1)
+        cls.episode = Episode.objects.create(season=cls.season, episode_number=2, title='Pilot')
+
+    def test_episode_str_without_extra_queries(self):
+        """Test that an Episode loaded with with_display() renders __str__ from the single query."""
+        with self.assertNumQueries(1):
+            episode = Episode.objects.with_display().get(pk=self.episode.pk)
+            self.assertEqual(str(episode), 'Show - Season 1 - Episode 2: Pilot')
+        self.assertIn('description', episode.season.media_item.get_deferred_fields())
+
+    def test_season_str_without_extra_queries(self):
+        """Test that a Season loaded with with_display() renders itself and its item without extra queries."""
+        with self.assertNumQueries(1):
+            season = Season.objects.with_display().get(pk=self.season.pk)
+            self.assertEqual(str(season), 'Show - Season 1')
+            self.assertEqual(str(season.media_item), 'Show (2020) [TV Show]')
+
+
+class ViewingHistoryManagerTests(TestCase):
+    """Tests for the select_related defaults of ViewingHistory.objects."""
+
+    def test_str_without_extra_queries(self):
+        """Test that history entries fetched through the default manager render __str__ in one query."""
+        user = get_user_model().objects.create_user(username='viewer', password='x')
+        item = MediaItem.objects.create(title='Movie')
+        source = Source.objects.create(name='Kodik', slug='kodik')
+        translation = Translation.objects.create(kodik_id=1, title='Dub')
+        link = MediaSourceLink.objects.create(media_item=item, source=source, translation=translation,
+                                              player_link='https://example.com/p')
+        ViewingHistory.objects.create(user=user, link=link)
+
+        with self.assertNumQueries(1):
+            entries = [str(entry) for entry in ViewingHistory.objects.all()]
+        self.assertTrue(entries[0].startswith('viewer watched Movie (Main Item) (Dub) at '))
+
+
+class MediaItemForListTests(TestCase):
+    """Tests for MediaItem.objects.for_list()."""
+
+    def test_loads_card_columns_and_genres(self):
+        """Test that for_list() defers text columns and serves genres from the prefetch."""
+        item = MediaItem.objects.create(title='Movie', description='Long text')
+        item.genres.add(Genre.objects.create(name='Drama'))
+
+        with self.assertNumQueries(2):
+            loaded = MediaItem.objects.for_list().get(pk=item.pk)
+            self.assertEqual([genre.name for genre in loaded.genres.all()], ['Drama'])
+            self.assertTrue(loaded.genres.exists())
+        self.assertIn('description', loaded.get_deferred_fields())
+
+
+class MediaItemMediaTypeDisplayTests(SimpleTestCase):
+    """Tests for MediaItem.get_media_type_display()."""
+
+    def test_media_type_display_uses_label_map(self):
+        """Test that get_media_type_display returns the choice label, or the raw value if it is not a choice."""
+        self.assertEqual(MediaItem(media_type=MediaItem.MediaType.ANIME_SERIES).get_media_type_display(),
+                         'Anime Series')
+        self.assertEqual(MediaItem(media_type='legacy').get_media_type_display(), 'legacy')
+
+
+class MediaSourceLinkConstraintTests(TestCase):
+    """Tests for MediaSourceLink target validation."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.source = Source.objects.create(name='Kodik', slug='kodik')
+        cls.item = MediaItem.objects.create(title='Show')
+        cls.other_item = MediaItem.objects.create(title='Other')
+        cls.episode = Episode.objects.create(
+            season=Season.objects.create(media_item=cls.item, season_number=1), episode_number=1
+        )
+
+    def test_link_without_target_is_rejected_by_db(self):
+        """Test that the check constraint rejects a link with neither media item nor episode."""
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            MediaSourceLink.objects.create(source=self.source, player_link='https://example.com/p')
+
+    def test_clean_checks_episode_item(self):
+        """Test that clean() rejects an episode of another item and accepts a matching one."""
+        link = MediaSourceLink(source=self.source, media_item=self.other_item, episode=self.episode,
+                               player_link='https://example.com/p')
+        with self.assertRaises(ValidationError):
+            link.clean()
+        link.media_item = self.item
+        with self.assertNumQueries(1):
+            link.clean()
+
+
+class TranslationCacheTests(TestCase):
+    """Tests for the in-process Translation cache used by MediaSourceLink.__str__."""
+
+    def test_str_reuses_cached_translation_until_it_changes(self):
+        """Test that translations are fetched once per process and refetched after a save."""
+        source = Source.objects.create(name='Kodik', slug='kodik')
+        translation = Translation.objects.create(kodik_id=1, title='Dub')
+        item = MediaItem.objects.create(title='Movie')
+        link = MediaSourceLink.objects.create(media_item=item, source=source, translation=translation,
+                                              player_link='https://example.com/p')
+        link = MediaSourceLink.objects.select_related('source', 'media_item').get(pk=link.pk)
+
+        with self.assertNumQueries(1):
+            self.assertEqual(str(link), 'Link from Kodik for Movie [Unknown] (Dub)')
+            self.assertEqual(str(link), 'Link from Kodik for Movie [Unknown] (Dub)')
+
+        translation.title = 'Voice'
+        translation.save()
+        self.assertEqual(str(link), 'Link from Kodik for Movie [Unknown] (Voice)')
+
+
+class ViewingHistoryMediaItemTests(TestCase):
+    """Tests for the media_item copied onto ViewingHistory."""
+
+    def test_save_fills_media_item_for_episode_and_item_links(self):
+        """Test that save() resolves the media item through the link's episode or the link itself."""
+        user = get_user_model().objects.create_user(username='viewer', password='x')
+        source = Source.objects.create(name='Kodik', slug='kodik')
+        item = MediaItem.objects.create(title='Show')
+        episode = Episode.objects.create(season=Season.objects.create(media_item=item, season_number=1),
+                                         episode_number=1)
+        episode_link = MediaSourceLink.objects.create(source=source, episode=episode,
+                                                      player_link='https://example.com/e')
+        item_link = MediaSourceLink.objects.create(source=source, media_item=item,
+                                                   player_link='https://example.com/m')
+
+        for link in (episode_link, item_link):
+            self.assertEqual(ViewingHistory.objects.create(user=user, link=link).media_item_id, item.pk)
+
+    def test_save_follows_a_changed_link(self):
+        """Test that pointing an existing entry at another item's link updates its media item."""
+        user = get_user_model().objects.create_user(username='viewer', password='x')
+        source = Source.objects.create(name='Kodik', slug='kodik')
+        first, second = MediaItem.objects.create(title='First'), MediaItem.objects.create(title='Second')
+        entry = ViewingHistory.objects.create(user=user, link=MediaSourceLink.objects.create(
+            source=source, media_item=first, player_link='https://example.com/1'))
+
+        entry.link = MediaSourceLink.objects.create(source=source, media_item=second,
+                                                    player_link='https://example.com/2')
+        entry.save()
+
+        entry.refresh_from_db()
+        self.assertEqual(entry.media_item_id, second.pk)
@@ -0,0 +1,62 @@
+# catalog/tests/test_populate_translations.py
+
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from catalog.models import MediaItem, MediaSourceLink, Source, Translation
+
+COMMAND_MODULE = 'catalog.management.commands.populate_translations'
+
+
+class PopulateTranslationsCommandTests(TestCase):
+    """Tests for the populate_translations management command with a stubbed Kodik client."""
+
+    def _run(self, results):
+        client = mock.MagicMock()
+        client.get_translations.return_value = {'results': results}
+        out = StringIO()
+        with mock.patch(f'{COMMAND_MODULE}.KodikApiClient', return_value=client):
+            call_command('populate_translations', stdout=out, verbosity=1)
+        return out.getvalue()
+
+    def test_creates_updates_and_skips(self):
+        """Test creating new rows, updating changed titles and skipping invalid entries."""
+        Translation.objects.create(kodik_id=609, title='AniDUB')
+        Translation.objects.create(kodik_id=610, title='Old Title')
+
+        output = self._run([
+            {'id': 609, 'title': 'AniDUB'},
+            {'id': 610, 'title': '  AniLibria  '},
+            {'id': 611, 'title': 'SHIZA Project'},
+            {'id': None, 'title': 'No ID'},
+            {'id': 612},
+        ])
+
+        self.assertEqual(Translation.objects.get(kodik_id=610).title, 'AniLibria')
+        self.assertEqual(Translation.objects.get(kodik_id=611).title, 'SHIZA Project')
+        self.assertEqual(Translation.objects.count(), 3)
+        self.assertIn('Created: 1', output)
+        self.assertIn('Updated: 1', output)
+        self.assertIn('Skipped: 2', output)
+
+    def test_duplicate_ids_keep_last_entry(self):
+        """Test that a repeated Kodik ID in the response results in a single row with the last title."""
+        self._run([{'id': 700, 'title': 'First'}, {'id': 700, 'title': 'Second'}])
+        self.assertEqual(Translation.objects.get(kodik_id=700).title, 'Second')
+
+    def test_renamed_title_reaches_cached_link_titles(self):
+        """Test that a title changed by the bulk upsert is not served from the translation cache."""
+        translation = Translation.objects.create(kodik_id=610, title='Old Title')
+        link = MediaSourceLink.objects.create(
+            source=Source.objects.create(name='Kodik', slug='kodik'), translation=translation,
+            media_item=MediaItem.objects.create(title='Movie'), player_link='//kodik.info/video/1/a/720p'
+        )
+        link = MediaSourceLink.objects.get(pk=link.pk)
+        self.assertIn('(Old Title)', str(link))
+
+        self._run([{'id': 610, 'title': 'AniLibria'}])
+
+        self.assertIn('(AniLibria)', str(MediaSourceLink.objects.get(pk=link.pk)))
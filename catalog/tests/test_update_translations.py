@@ -0,0 +1,281 @@
+# catalog/tests/test_update_translations.py
+
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from catalog.models import (
+    MediaItem, Source, Season, Episode, MediaSourceLink, Screenshot, Translation, MediaItemSourceMetadata
+)
+
+COMMAND_MODULE = 'catalog.management.commands.update_translations'
+
+
+def _make_client(results):
+    """Builds a KodikApiClient stand-in whose async search returns the given variants."""
+    client = mock.MagicMock()
+    client.async_session.return_value = mock.AsyncMock()
+    client.search_by_ids_async = mock.AsyncMock(return_value={'results': results})
+    return client
+
+
+@override_settings(KODIK_TRANSLATION_MAP_CACHE='')
+class UpdateTranslationsCommandTests(TestCase):
+    """Tests for the update_translations management command with a stubbed Kodik client."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.source_kodik = Source.objects.create(name='Kodik', slug='kodik')
+        cls.translation1 = Translation.objects.create(kodik_id=610, title='AniLibria')
+        cls.translation2 = Translation.objects.create(kodik_id=609, title='AniDUB')
+        cls.item = MediaItem.objects.create(
+            title='Test Serial', media_type=MediaItem.MediaType.ANIME_SERIES, shikimori_id='100'
+        )
+
+    def _variant(self, translation, episodes, link='//kodik.info/serial/1/hash/720p'):
+        return {
+            'id': f'serial-{translation.kodik_id}',
+            'link': link,
+            'quality': 'WEB-DLRip 720p',
+            'translation': {'id': translation.kodik_id, 'title': translation.title},
+            'seasons': {'1': {'episodes': episodes}},
+        }
+
+    def _run(self, results, **options):
+        client = _make_client(results)
+        with mock.patch(f'{COMMAND_MODULE}.KodikApiClient', return_value=client):
+            call_command('update_translations', pk=[self.item.pk], stdout=StringIO(), verbosity=0, **options)
+        return client
+
+    def test_creates_seasons_episodes_screenshots_and_links(self):
+        """Test a first run creating the full hierarchy for two translations."""
+        episodes = {
+            '1': {'link': '//kodik.info/seria/1/a/720p', 'title': 'Pilot',
+                  'screenshots': ['https://i.kodik.biz/1.jpg', 'https://i.kodik.biz/2.jpg', 'not-a-url']},
+            '2': '//kodik.info/seria/2/b/720p',
+        }
+        self._run([self._variant(self.translation1, episodes), self._variant(self.translation2, episodes)])
+
+        season = Season.objects.get(media_item=self.item)
+        self.assertEqual(season.season_number, 1)
+        self.assertEqual(Episode.objects.filter(season=season).count(), 2)
+        self.assertEqual(Episode.objects.get(season=season, episode_number=1).title, 'Pilot')
+        self.assertEqual(Screenshot.objects.count(), 2)
+        # One main link + two episode links per translation
+        self.assertEqual(MediaSourceLink.objects.filter(media_item=self.item, episode=None).count(), 2)
+        self.assertEqual(MediaSourceLink.objects.filter(episode__season=season).count(), 4)
+
+    def test_rerun_updates_existing_links_in_place(self):
+        """Test that a second run updates links and episodes without duplicating rows."""
+        episodes = {'1': {'link': '//kodik.info/seria/1/a/720p', 'title': 'Pilot'}}
+        self._run([self._variant(self.translation1, episodes)])
+        link_pks = set(MediaSourceLink.objects.values_list('pk', flat=True))
+
+        episodes = {'1': {'link': '//kodik.info/seria/1/new/1080p', 'title': 'Pilot (Remastered)'}}
+        self._run([self._variant(self.translation1, episodes)])
+
+        self.assertEqual(set(MediaSourceLink.objects.values_list('pk', flat=True)), link_pks)
+        self.assertEqual(Episode.objects.get().title, 'Pilot (Remastered)')
+        ep_link = MediaSourceLink.objects.get(episode__isnull=False)
+        self.assertEqual(ep_link.player_link, '//kodik.info/seria/1/new/1080p')
+
+    def test_cleanup_removes_stale_links(self):
+        """Test that --cleanup deletes links no longer returned by the API."""
+        episodes = {'1': '//kodik.info/seria/1/a/720p'}
+        self._run([self._variant(self.translation1, episodes), self._variant(self.translation2, episodes)])
+        self.assertEqual(MediaSourceLink.objects.count(), 4)
+
+        self._run([self._variant(self.translation1, episodes)], cleanup=True)
+
+        self.assertEqual(MediaSourceLink.objects.count(), 2)
+        self.assertFalse(MediaSourceLink.objects.filter(translation=self.translation2).exists())
+
+    def test_unknown_translation_is_skipped(self):
+        """Test that variants with a translation missing from the local table are ignored."""
+        unknown = Translation(kodik_id=9999, title='Unknown')
+        self._run([self._variant(unknown, {'1': '//kodik.info/seria/1/a/720p'})])
+        self.assertEqual(MediaSourceLink.objects.count(), 0)
+
+    def test_unchanged_response_skips_writes(self):
+        """Test that an identical response only refreshes last_seen_at on existing links."""
+        episodes = {'1': {'link': '//kodik.info/seria/1/a/720p', 'title': 'Pilot'}}
+        results = [self._variant(self.translation1, episodes)]
+        self._run(results)
+        meta = MediaItemSourceMetadata.objects.get(media_item=self.item, source=self.source_kodik)
+        self.assertTrue(meta.last_response_hash)
+        Episode.objects.update(title='Edited locally')
+        seen_before = MediaSourceLink.objects.get(episode__isnull=False).last_seen_at
+
+        self._run(results)
+
+        self.assertEqual(Episode.objects.get().title, 'Edited locally')
+        self.assertGreater(MediaSourceLink.objects.get(episode__isnull=False).last_seen_at, seen_before)
+
+    def test_unchanged_response_is_reprocessed_after_translation_added(self):
+        """Test that a new Translation row invalidates the unchanged-response skip."""
+        late = Translation(kodik_id=611, title='SHIZA Project')
+        results = [self._variant(late, {'1': '//kodik.info/seria/1/a/720p'})]
+        self._run(results)
+        self.assertEqual(MediaSourceLink.objects.count(), 0)
+
+        late.save()
+        self._run(results)
+
+        self.assertEqual(MediaSourceLink.objects.filter(translation=late).count(), 2)
+
+    def test_skip_recently_updated_meta(self):
+        """Test that --all with --skip-recently-updated-meta leaves out items with fresh metadata."""
+        stale_item = MediaItem.objects.create(
+            title='Stale Serial', media_type=MediaItem.MediaType.ANIME_SERIES, shikimori_id='200'
+        )
+        MediaItemSourceMetadata.objects.create(
+            media_item=self.item, source=self.source_kodik, source_last_updated_at=timezone.now()
+        )
+        client = _make_client([])
+        with mock.patch(f'{COMMAND_MODULE}.KodikApiClient', return_value=client):
+            call_command('update_translations', all=True, skip_recently_updated_meta=24,
+                         stdout=StringIO(), verbosity=0)
+
+        searched_ids = [call.kwargs.get('shikimori_id') for call in client.search_by_ids_async.await_args_list]
+        self.assertEqual(searched_ids, [stale_item.shikimori_id])
+
+    def test_all_excludes_items_without_external_ids(self):
+        """Test that --all never loads items that have no external ID to search by."""
+        MediaItem.objects.create(title='No IDs', media_type=MediaItem.MediaType.MOVIE, imdb_id='')
+        client = _make_client([])
+        out = StringIO()
+        with mock.patch(f'{COMMAND_MODULE}.KodikApiClient', return_value=client):
+            call_command('update_translations', all=True, stdout=out, verbosity=1)
+
+        self.assertIn('Found 1 MediaItems to process.', out.getvalue())
+        self.assertEqual(client.search_by_ids_async.await_count, 1)
+
+    def test_items_sharing_an_id_are_searched_once(self):
+        """Test that items with the same external ID in one window share a single /search request."""
+        duplicate = MediaItem.objects.create(title='Duplicate', media_type=MediaItem.MediaType.ANIME_SERIES,
+                                             shikimori_id='100')
+        client = _make_client([self._variant(self.translation1, {'1': '//kodik.info/seria/1/a/720p'})])
+        with mock.patch(f'{COMMAND_MODULE}.KodikApiClient', return_value=client):
+            call_command('update_translations', pk=[self.item.pk, duplicate.pk], stdout=StringIO(), verbosity=0)
+
+        self.assertEqual(client.search_by_ids_async.await_count, 1)
+        self.assertEqual(MediaSourceLink.objects.filter(media_item__in=[self.item, duplicate]).count(), 2)
+
+    def test_translation_map_cache_file(self):
+        """Test that the translation map is written to the cache file and reused while the table is unchanged."""
+        episodes = {'1': '//kodik.info/seria/1/a/720p'}
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cache_path = os.path.join(tmp_dir, 'translation_map.json')
+            with override_settings(KODIK_TRANSLATION_MAP_CACHE=cache_path), \
+                    mock.patch.dict(f'{COMMAND_MODULE}._translation_map_memo', clear=True):
+                self._run([self._variant(self.translation1, episodes)])
+                with open(cache_path, encoding='utf-8') as cache_file:
+                    cached = json.load(cache_file)
+                self.assertIn([self.translation1.kodik_id, self.translation1.pk], cached['pairs'])
+
+                self._run([self._variant(self.translation2, episodes)])
+
+        self.assertTrue(MediaSourceLink.objects.filter(translation=self.translation2).exists())
+
+    def test_cleanup_on_unchanged_response(self):
+        """Test that --cleanup still removes links left over from an earlier run when the response is unchanged."""
+        episodes = {'1': '//kodik.info/seria/1/a/720p'}
+        self._run([self._variant(self.translation1, episodes), self._variant(self.translation2, episodes)])
+        self._run([self._variant(self.translation1, episodes)])
+        self.assertEqual(MediaSourceLink.objects.count(), 4)
+
+        self._run([self._variant(self.translation1, episodes)], cleanup=True)
+
+        self.assertEqual(MediaSourceLink.objects.count(), 2)
+        self.assertFalse(MediaSourceLink.objects.filter(translation=self.translation2).exists())
+
+    def test_skip_checked_within(self):
+        """Test that --skip-checked-within leaves out items fetched by a recent run."""
+        self._run([])
+        meta = MediaItemSourceMetadata.objects.get(media_item=self.item, source=self.source_kodik)
+        self.assertIsNotNone(meta.last_checked_at)
+
+        client = _make_client([])
+        with mock.patch(f'{COMMAND_MODULE}.KodikApiClient', return_value=client):
+            call_command('update_translations', all=True, skip_checked_within=6, stdout=StringIO(), verbosity=0)
+        client.search_by_ids_async.assert_not_awaited()
+
+    def test_bare_link_variant_keeps_episode_title(self):
+        """Test that a variant listing an episode as a bare link doesn't clear the title from another variant."""
+        titled = {'1': {'link': '//kodik.info/seria/1/a/720p', 'title': 'Pilot',
+                        'screenshots': ['https://i.kodik.biz/1.jpg']}}
+        bare = {'1': '//kodik.info/seria/1/b/720p'}
+        self._run([self._variant(self.translation1, titled), self._variant(self.translation2, bare)])
+
+        self.assertEqual(Episode.objects.get().title, 'Pilot')
+        self.assertEqual(Screenshot.objects.count(), 1)
+
+    def test_invalid_season_and_episode_keys_are_ignored(self):
+        """Test that non-numeric or out-of-range season/episode keys are skipped."""
+        variant = self._variant(self.translation1, {'1': '//kodik.info/seria/1/a/720p', 'x': '//bad', '0': '//bad'})
+        variant['seasons']['junk'] = {'episodes': {'1': '//kodik.info/seria/9/a/720p'}}
+        variant['seasons']['-2'] = {'episodes': {'1': '//kodik.info/seria/8/a/720p'}}
+        self._run([variant])
+
+        self.assertEqual(list(Season.objects.values_list('season_number', flat=True)), [1])
+        self.assertEqual(list(Episode.objects.values_list('episode_number', flat=True)), [1])
+
+    def test_fetch_batch_size_groups_items_into_one_request(self):
+        """Test that --fetch-batch-size searches several items at once and splits the results by ID."""
+        other = MediaItem.objects.create(
+            title='Other Serial', media_type=MediaItem.MediaType.ANIME_SERIES, shikimori_id='200'
+        )
+        episodes = {'1': '//kodik.info/seria/1/a/720p'}
+        results = [
+            {**self._variant(self.translation1, episodes), 'shikimori_id': '100'},
+            {**self._variant(self.translation2, episodes), 'shikimori_id': '200'},
+        ]
+        client = _make_client(results)
+        client.search_by_ids_async.return_value = {'results': results, 'total': 2}
+        with mock.patch(f'{COMMAND_MODULE}.KodikApiClient', return_value=client):
+            call_command('update_translations', pk=[self.item.pk, other.pk], fetch_batch_size=10,
+                         stdout=StringIO(), verbosity=0)
+
+        client.search_by_ids_async.assert_awaited_once()
+        self.assertEqual(client.search_by_ids_async.await_args.kwargs['shikimori_id'], '100,200')
+        self.assertEqual(MediaSourceLink.objects.get(media_item=self.item).translation, self.translation1)
+        self.assertEqual(MediaSourceLink.objects.get(media_item=other).translation, self.translation2)
+
+    def test_fetch_batch_size_refetches_items_without_batch_results(self):
+        """Test that an item the batch found nothing for gets its own search instead of an empty response."""
+        other = MediaItem.objects.create(
+            title='Other Serial', media_type=MediaItem.MediaType.ANIME_SERIES, shikimori_id='200', mydramalist_id='2'
+        )
+        episodes = {'1': '//kodik.info/seria/1/a/720p'}
+        batch_results = [{**self._variant(self.translation1, episodes), 'shikimori_id': '100'}]
+        client = _make_client([])
+        client.search_by_ids_async.side_effect = [
+            {'results': batch_results, 'total': 1},
+            {'results': [self._variant(self.translation2, episodes)]},
+        ]
+        with mock.patch(f'{COMMAND_MODULE}.KodikApiClient', return_value=client):
+            call_command('update_translations', pk=[self.item.pk, other.pk], fetch_batch_size=10,
+                         stdout=StringIO(), verbosity=0)
+
+        self.assertEqual(client.search_by_ids_async.await_count, 2)
+        self.assertEqual(client.search_by_ids_async.await_args.kwargs['mydramalist_id'], '2')
+        self.assertEqual(MediaSourceLink.objects.get(media_item=other).translation, self.translation2)
+
+    def test_cleanup_is_scoped_to_processed_item(self):
+        """Test that --cleanup only deletes stale links of the processed item, not of other items."""
+        other = MediaItem.objects.create(title='Other', media_type=MediaItem.MediaType.MOVIE, imdb_id='tt1')
+        other_link = MediaSourceLink.objects.create(
+            media_item=other, source=self.source_kodik, translation=self.translation2,
+            player_link='//kodik.info/video/1/a/720p'
+        )
+        episodes = {'1': '//kodik.info/seria/1/a/720p'}
+        self._run([self._variant(self.translation1, episodes)], cleanup=True)
+
+        self.assertTrue(MediaSourceLink.objects.filter(pk=other_link.pk).exists())
+        self.assertEqual(MediaSourceLink.objects.filter(media_item=self.item).count(), 1)
@@ -0,0 +1,39 @@
+# catalog/tests/test_views.py
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from catalog.models import MediaItem, Season, Episode, MediaSourceLink, Source, ViewingHistory
+
+
+class TrackWatchViewTests(TestCase):
+    """Tests for the watch history tracking endpoint."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='viewer', password='x')
+        item = MediaItem.objects.create(title='Show')
+        cls.episode = Episode.objects.create(
+            season=Season.objects.create(media_item=item, season_number=1), episode_number=1
+        )
+        cls.link = MediaSourceLink.objects.create(source=Source.objects.create(name='Kodik', slug='kodik'),
+                                                  episode=cls.episode, player_link='https://example.com/p')
+
+    def test_repeated_tracking_upserts_one_entry(self):
+        """Test that tracking the same link twice keeps one history row with the link's episode."""
+        self.client.force_login(self.user)
+        url = reverse('catalog:track_watch_history')
+        for _ in range(2):
+            response = self.client.post(url, {'link_pk': self.link.pk})
+            self.assertEqual(response.json()['status'], 'success')
+
+        entry = ViewingHistory.objects.get(user=self.user)
+        self.assertEqual(entry.link_id, self.link.pk)
+        self.assertEqual(entry.episode_id, self.episode.pk)
+
+    def test_tracking_records_media_item(self):
+        """Test that tracking an episode link stores the episode's media item on the history entry."""
+        self.client.force_login(self.user)
+        self.client.post(reverse('catalog:track_watch_history'), {'link_pk': self.link.pk})
+        self.assertEqual(ViewingHistory.objects.get(user=self.user).media_item_id, self.episode.season.media_item_id)
@@ -1,6 +1,7 @@
 # catalog/views.py
 import json
 from math import inf
+from operator import itemgetter
 from typing import Optional
 from urllib.parse import urlparse, parse_qs
 from django.db import models
@@ -18,10 +19,13 @@ from django.views.generic import ListView, DetailView, View
 
 from .forms import AdvancedMediaSearchForm
 from .models import (
-    MediaItem, MediaSourceLink, Season, Episode, ViewingHistory, Favorite,  # Added models needed
+    MediaItem, MediaSourceLink, Season, Episode, Screenshot, ViewingHistory, Favorite,  # Added models needed
     # Ensure all models are imported if used below
 )
 
+# Sort key for per-episode link lists; built once instead of a lambda per episode.
+_BY_TRANSLATION_TITLE = itemgetter('translation_title')
+
 
 class MediaItemListView(ListView):
     """ Displays a list of Media Items. """
@@ -32,8 +36,8 @@ class MediaItemListView(ListView):
 
     def get_queryset(self):
         """Prefetches related data."""
-        # Prefetch genres for card display
-        return MediaItem.objects.prefetch_related('genres', 'countries').order_by('-updated_at', 'title')
+        # Only the card's columns, with genres prefetched for display
+        return MediaItem.objects.for_list().order_by('-updated_at', 'title')
 
 
 class MediaItemDetailView(DetailView):
@@ -42,6 +46,8 @@ class MediaItemDetailView(DetailView):
     template_name = 'catalog/mediaitem_detail.html'
     context_object_name = 'media_item'
     RELATED_ITEM_LIMIT = getattr(settings, 'CATALOG_RELATED_ITEM_LIMIT', 100)  # Max related items to show
+    # Link columns the player data is built from (plus the FK each prefetch joins on)
+    LINK_DISPLAY_FIELDS = ('player_link', 'quality_info', 'translation__kodik_id', 'translation__title')
 
     def get_queryset(self):
         """Prefetches related data and annotates favorite status."""
@@ -60,10 +66,10 @@ class MediaItemDetailView(DetailView):
         return queryset.prefetch_related(
             'genres',
             'countries',
-            'source_metadata__source',
             Prefetch(
                 'source_links',
-                queryset=MediaSourceLink.objects.filter(episode__isnull=True).select_related('translation', 'source'),
+                queryset=MediaSourceLink.objects.filter(episode__isnull=True).select_related('translation').only(
+                    'media_item', *self.LINK_DISPLAY_FIELDS).order_by('-added_at'),
                 to_attr='main_source_links'
             ),
             Prefetch(
@@ -72,10 +78,14 @@ class MediaItemDetailView(DetailView):
                     Prefetch(
                         'episodes',
                         queryset=Episode.objects.order_by('episode_number').prefetch_related(
-                            'screenshots',
+                            # Ordered, so the template's screenshots.first is served from the prefetch;
+                            # the url_hash digest is only for the unique constraint.
+                            Prefetch('screenshots', queryset=Screenshot.objects.only('episode', 'url').order_by('id')),
                             Prefetch(
                                 'source_links',
-                                queryset=MediaSourceLink.objects.select_related('translation', 'source')
+                                queryset=MediaSourceLink.objects.select_related('translation').only(
+                                    'episode', *self.LINK_DISPLAY_FIELDS),
+                                to_attr='prefetched_links'
                             )
                         ),
                         to_attr='prefetched_episodes'
@@ -98,15 +108,15 @@ class MediaItemDetailView(DetailView):
                 if hasattr(season, 'prefetched_episodes'):
                     for episode in season.prefetched_episodes:
                         episode_links = []
-                        if hasattr(episode, 'source_links'):
-                            for link in episode.source_links.all():
+                        if hasattr(episode, 'prefetched_links'):
+                            for link in episode.prefetched_links:
                                 if link.translation:
                                     start_from = self._extract_start_from(link.player_link)
                                     episode_links.append({'translation_id': link.translation.kodik_id,
                                                           'translation_title': link.translation.title,
                                                           'link_pk': link.pk, 'quality': link.quality_info,
                                                           'start_from': start_from})
-                        episode_links.sort(key=lambda x: x['translation_title'])
+                        episode_links.sort(key=_BY_TRANSLATION_TITLE)
                         episodes_data[episode.pk] = episode_links
         if hasattr(media_item, 'main_source_links'):
             for link in media_item.main_source_links:
@@ -146,8 +156,7 @@ class MediaItemDetailView(DetailView):
         if has_relation_id:  # Only search if we have KP or IMDb ID
             related_items_qs = MediaItem.objects.filter(related_q).exclude(
                 pk=media_item.pk  # Exclude self
-            ).prefetch_related(
-                'genres'  # Prefetch genres for related item cards
+            ).for_list(  # Card columns and genres for related item cards
             ).order_by(
                 '-release_year', '-updated_at'  # Order by relevance (newest first)
             )[:self.RELATED_ITEM_LIMIT]  # Apply limit
@@ -238,7 +247,7 @@ class MediaItemSearchView(ListView):
     paginate_by = 20
 
     def get_queryset(self):
-        queryset = MediaItem.objects.prefetch_related('genres', 'countries').order_by('-updated_at', 'title')
+        queryset = MediaItem.objects.for_list().order_by('-updated_at', 'title')
         form = AdvancedMediaSearchForm(self.request.GET)
         if form.is_valid():
             query = form.cleaned_data.get('q')
@@ -272,14 +281,24 @@ class TrackWatchView(LoginRequiredMixin, View):
             link_pk = int(link_pk)
         except (ValueError, TypeError):
             return HttpResponseBadRequest("Invalid 'link_pk' parameter.")
-        source_link = get_object_or_404(MediaSourceLink.objects.select_related('episode'), pk=link_pk)
-        defaults = {'episode': source_link.episode}
+        source_link = get_object_or_404(
+            MediaSourceLink.objects.select_related('episode__season').only(
+                'id', 'media_item_id', 'episode_id', 'episode__season_id', 'episode__season__media_item_id'
+            ),
+            pk=link_pk
+        )
         try:
-            history_entry, created = ViewingHistory.objects.update_or_create(user=request.user, link=source_link,
-                                                                             defaults=defaults)
-            action = "created" if created else "updated"
+            # One INSERT ... ON CONFLICT instead of update_or_create's SELECT followed by UPDATE/INSERT.
+            # bulk_create skips save(), so the denormalized media_item is set here.
+            ViewingHistory.objects.bulk_create(
+                [ViewingHistory(user=request.user, link=source_link, episode_id=source_link.episode_id,
+                                media_item_id=source_link.target_media_item_id)],
+                update_conflicts=True, unique_fields=['user', 'link'],
+                update_fields=['episode', 'media_item', 'watched_at']
+            )
+            action = "saved"
             print(
-                f"Viewing history {action} for user {request.user.username}, link {link_pk}, episode {source_link.episode}")
+                f"Viewing history {action} for user {request.user.username}, link {link_pk}, episode {source_link.episode_id}")
             return JsonResponse({'status': 'success', 'action': action})
         except Exception as e:
             print(f"Error saving viewing history: {e}")
@@ -14,6 +14,7 @@ https://docs.django-cms.org/en/release-4.1.x/reference/configuration.html
 """
 
 import os
+import tempfile
 from pathlib import Path
 
 from django.core.exceptions import ImproperlyConfigured
@@ -141,6 +142,9 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        # Keep connections open between requests/commands instead of reconnecting each time
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -254,11 +258,19 @@ elif not KODIK_API_TOKEN and not DEBUG:
     # Optional: raise an error if token is missing in production
     raise ImproperlyConfigured("KODIK_API_TOKEN must be set in environment variables for production.")
 
+# File used by update_translations to reuse the Kodik translation map between runs; empty string disables it.
+KODIK_TRANSLATION_MAP_CACHE = os.environ.get(
+    'KODIK_TRANSLATION_MAP_CACHE', os.path.join(tempfile.gettempdir(), 'just_media_kodik_translation_map.json')
+)
+
 LOGIN_REDIRECT_URL = '/'
 LOGOUT_REDIRECT_URL = '/'
 
 CATALOG_RELATED_ITEM_LIMIT = os.environ.get('CATALOG_RELATED_ITEM_LIMIT', 100)
 
+# Rows per statement for bulk_create/bulk_update/delete in the catalog import commands.
+JUST_MEDIA_BULK_BATCH_SIZE = int(os.environ.get('JUST_MEDIA_BULK_BATCH_SIZE', 500))
+
 LOGGING_DIR = BASE_DIR / 'logs'
 LOGGING_DIR.mkdir(exist_ok=True)
 